@@ -1,18 +1,72 @@
-from typing import Dict, Any, List
-import google.generativeai as genai
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import os
 from .base import BaseAgent
 import re
-from sentence_transformers import SentenceTransformer
-import torch
+from services import embedding_service, scoring_service, grading_service, cpu_executor
+from services.llm_client import get_llm_client
+from services.batching import MicroBatcher
+
+# 단일 답안 채점 요청을 모으는 최대 대기 시간(ms)과 배치 크기
+EVALUATOR_BATCH_MAX_WAIT_MS = float(os.getenv("EVALUATOR_BATCH_MAX_WAIT_MS", "30"))
+EVALUATOR_BATCH_MAX_SIZE = int(os.getenv("EVALUATOR_BATCH_MAX_SIZE", "20"))
+
+
+def parse_llm_results(text, count: int) -> Optional[Tuple[Dict[int, Dict], Optional[str]]]:
+    """LLM 채점 응답을 {문제 id: 결과}로 변환 (JSON이 아니거나 id가 1..count와 정확히 맞지 않으면 None)"""
+    if not isinstance(text, str):
+        return None
+    # 코드 블록 제거 후 JSON 시작/끝 위치 찾기
+    text = re.sub(r'```(?:json)?', '', text)
+    start, end = text.find('{'), text.rfind('}') + 1
+    if start == -1 or end <= start:
+        return None
+    try:
+        result = json.loads(text[start:end])
+    except json.JSONDecodeError:
+        return None
+    items = result.get("results") if isinstance(result, dict) else None
+    if not isinstance(items, list) or len(items) != count:
+        return None
+
+    by_id = {}
+    for item in items:
+        if not isinstance(item, dict):
+            return None
+        try:
+            item_id = int(item.get("id"))
+        except (ValueError, TypeError):
+            return None
+        if item_id in by_id or not 1 <= item_id <= count:
+            return None
+        by_id[item_id] = item
+    total = result.get("total")
+    return by_id, total.get("overall_feedback") if isinstance(total, dict) else None
+
+
+def failed_evaluation(answers: List[Dict], feedback: str) -> Dict:
+    """모든 답안을 평가 실패(0점)로 처리한 결과"""
+    return {
+        "results": [grading_service.make_result(answer, False, 0.0, feedback, "llm") for answer in answers],
+        "total": {
+            "total_score": 0,
+            "total_questions": len(answers),
+            "score_percentage": 0.0,
+            "overall_feedback": "답안 평가 중 오류가 발생했습니다."
+        }
+    }
 
 class EvaluatorAgent(BaseAgent):
     def __init__(self, api_key: str, api_url: str):
         super().__init__("evaluator")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-        # RAG 모델 초기화
-        self.rag_model = SentenceTransformer('jhgan/ko-sroberta-multitask')
+        self.llm = get_llm_client(api_key)
+        self.model_name = 'gemini-2.0-flash'
+        # 동시에 들어온 단일 답안 채점을 한 번의 evaluate_answers 호출로 묶음
+        self.single_answer_batcher = MicroBatcher(
+            self._evaluate_answer_batch,
+            max_batch_size=EVALUATOR_BATCH_MAX_SIZE,
+            max_wait=EVALUATOR_BATCH_MAX_WAIT_MS / 1000,
+        )
     
     async def execute_function(self, function_name: str, arguments: Dict[str, Any]) -> Any:
         if function_name == "evaluate_answers":
@@ -24,10 +78,58 @@ class EvaluatorAgent(BaseAgent):
         raise ValueError(f"Unknown function: {function_name}")
     
     async def evaluate_answers(self, answers: List[Dict]) -> Dict:
-        """여러 답안을 한 번에 평가"""
+        """여러 답안을 한 번에 평가
+
+        보기 일치로 확정할 수 있는 답안은 로컬에서 바로 채점하고, 짧은 서술형 답안은
+        임베딩 유사도로 사전 채점한다. 확정하지 못한 답안만 모아 한 번의 LLM 호출로 평가한다.
+        """
+        results = [grading_service.grade_locally(answer) for answer in answers]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        # 짧은 서술형 답안은 임베딩 유사도로 사전 채점 (불확실한 답안만 LLM으로)
+        if pending:
+            semantic_results = await cpu_executor.run(
+                grading_service.grade_semantically, [answers[i] for i in pending]
+            )
+            for i, result in zip(pending, semantic_results):
+                results[i] = result
+            pending = [i for i in pending if results[i] is None]
+        print(f"[DEBUG] 로컬 채점 {len(answers) - len(pending)}개, LLM 채점 {len(pending)}개")
+
+        overall_feedback = None
+        if pending:
+            llm_result = await self._evaluate_with_llm([answers[i] for i in pending])
+            llm_results = llm_result.get("results", [])
+            for n, i in enumerate(pending):
+                if n < len(llm_results):
+                    results[i] = {**llm_results[n], "grading": "llm"}
+                else:
+                    results[i] = grading_service.make_result(answers[i], False, 0.0, "평가 실패", "llm")
+            overall_feedback = llm_result.get("total", {}).get("overall_feedback")
+
+        total_questions = len(answers)
+        total_score = sum(r.get("score", 0.0) for r in results)
+        score_percentage = (total_score / total_questions) * 100 if total_questions > 0 else 0
+        return {
+            "results": results,
+            "total": {
+                "total_score": int(total_score),  # 맞은 문제 수
+                "total_questions": total_questions,
+                "score_percentage": round(score_percentage, 2),
+                "overall_feedback": overall_feedback or
+                    f"총 {total_questions}문제 중 {int(total_score)}문제를 맞추었습니다. (정답률: {round(score_percentage, 2)}%)"
+            }
+        }
+
+    async def _evaluate_with_llm(self, answers: List[Dict]) -> Dict:
+        """로컬에서 채점할 수 없는 답안들을 한 번의 LLM 호출로 평가
+
+        배치에는 여러 사용자의 답안이 섞일 수 있으므로 결과는 프롬프트에 넣은 번호(id)로만 답안에 연결하고,
+        문제/답안/정답 텍스트는 항상 제출된 값을 사용한다. 번호가 맞지 않는 답안은 평가 실패로 처리한다.
+        """
         try:
             answers_text = "\n".join([
-                f"문제 {i+1}:\n질문: {answer['question']}\n답변: {answer['user_answer']}\n정답: {answer['correct_answer']}"
+                f"문제 id {i+1}:\n질문: {answer['question']}\n답변: {answer['user_answer']}\n정답: {answer['correct_answer']}"
                 for i, answer in enumerate(answers)
             ])
             
@@ -36,22 +138,18 @@ class EvaluatorAgent(BaseAgent):
 답안들:
 {answers_text}
 
-반드시 다음 JSON 형식으로만 응답하세요. 다른 텍스트나 설명을 포함하지 마세요:
+반드시 다음 JSON 형식으로만 응답하세요. 다른 텍스트나 설명을 포함하지 마세요.
+results에는 모든 문제에 대해 하나씩, 위에 적힌 문제 id를 그대로 넣어 주세요:
 {{
     "results": [
         {{
-            "question": "문제 내용",
-            "user_answer": "제출한 답안",
-            "correct_answer": "정답",
+            "id": 1,
             "is_correct": true/false,
             "feedback": "개별 피드백 (50자 이내)",
             "score": 1.0
         }}
     ],
     "total": {{
-        "total_score": 0,
-        "total_questions": {len(answers)},
-        "score_percentage": 0.0,
         "overall_feedback": "종합 평가 (100자 이내)"
     }}
 }}
@@ -60,130 +158,67 @@ class EvaluatorAgent(BaseAgent):
 1. 답변이 정확히 일치하지 않더라도, 핵심 개념이 맞으면 부분 점수 부여
 2. 오탈자나 띄어쓰기 차이는 무시
 3. 객관식의 경우 번호나 내용이 정확히 일치해야 함
-4. 각 문제의 점수는 0.0 ~ 1.0 사이의 값으로 평가
-5. 총점은 각 문제의 점수 합계이며, 백분율은 (총점 / 문제 수 * 100)으로 계산"""
+4. 각 문제의 점수는 0.0 ~ 1.0 사이의 값으로 평가"""
 
-            response = self.model.generate_content(prompt)
-            json_str = response.text
-            
-            # JSON 문자열 정제
-            if isinstance(json_str, str):
-                # 코드 블록 제거
-                json_str = re.sub(r'```json\s*|\s*```', '', json_str)
-                json_str = re.sub(r'```\s*|\s*```', '', json_str)
-                
-                # JSON 시작/끝 위치 찾기
-                start = json_str.find('{')
-                end = json_str.rfind('}') + 1
-                
-                if start != -1 and end > start:
-                    json_str = json_str[start:end]
-                    print(f"\n[DEBUG] 정제된 JSON 문자열:\n{json_str}")
-                    
-                    result = json.loads(json_str)
-                    
-                    # 결과 검증 및 보정
-                    if "results" not in result or not isinstance(result["results"], list):
-                        # 결과가 없거나 잘못된 형식인 경우 기본 응답 생성
-                        result["results"] = []
-                        for answer in answers:
-                            result["results"].append({
-                                "question": answer["question"],
-                                "user_answer": answer["user_answer"],
-                                "correct_answer": answer["correct_answer"],
-                                "is_correct": False,
-                                "feedback": "평가 실패",
-                                "score": 0.0
-                            })
-                    
-                    # 각 결과에 필수 필드가 있는지 확인하고 보정
-                    for i, res in enumerate(result["results"]):
-                        if i < len(answers):  # 원본 답안이 있는 경우에만
-                            res["question"] = res.get("question", answers[i]["question"])
-                            res["user_answer"] = res.get("user_answer", answers[i]["user_answer"])
-                            res["correct_answer"] = res.get("correct_answer", answers[i]["correct_answer"])
-                            res["is_correct"] = res.get("is_correct", False)
-                            res["feedback"] = res.get("feedback", "평가 실패")
-                            # score를 float으로 변환하고 0~1 범위로 제한
-                            try:
-                                score = float(res.get("score", 0.0))
-                                res["score"] = max(0.0, min(1.0, score))  # 0~1 범위로 제한
-                            except (ValueError, TypeError):
-                                res["score"] = 0.0
-                    
-                    # total 정보 계산 및 보정
-                    total_questions = len(answers)
-                    if total_questions > 0:
-                        # 각 문제의 점수를 합산 (0~1 범위의 점수)
-                        total_score = sum(r.get("score", 0.0) for r in result["results"])
-                        # 백분율 계산 (0~100 범위)
-                        score_percentage = (total_score / total_questions) * 100
-                    else:
-                        total_score = 0
-                        score_percentage = 0
-                    
-                    # 점수 정보를 정수로 변환하여 저장
-                    result["total"] = {
-                        "total_score": int(total_score),  # 맞은 문제 수
-                        "total_questions": total_questions,
-                        "score_percentage": round(score_percentage, 2),  # 소수점 2자리까지 표시
-                        "overall_feedback": result.get("total", {}).get("overall_feedback", 
-                            f"총 {total_questions}문제 중 {int(total_score)}문제를 맞추었습니다. (정답률: {round(score_percentage, 2)}%)")
-                    }
-                    
-                    print(f"[DEBUG] 점수 계산 결과: 총점={total_score}, 문제수={total_questions}, 백분율={score_percentage}%")
-                    return result
-                    
-            # 응답 파싱 실패 시 기본 응답 생성
-            default_results = []
-            for answer in answers:
-                default_results.append({
+            # 같은 답안 묶음에 대한 채점 결과는 재사용 (파싱되는 응답만 캐시)
+            json_str = await self.llm.generate(
+                prompt,
+                model=self.model_name,
+                cache=True,
+                validate=lambda response: parse_llm_results(response, len(answers)) is not None
+            )
+            parsed = parse_llm_results(json_str, len(answers))
+            if parsed is None:
+                print("[ERROR] 답안 평가 응답 파싱 실패")
+                return failed_evaluation(answers, "답안 평가 중 오류가 발생했습니다.")
+
+            by_id, overall_feedback = parsed
+            results = []
+            for i, answer in enumerate(answers):
+                res = by_id.get(i + 1)
+                if res is None:
+                    results.append(grading_service.make_result(answer, False, 0.0, "평가 실패", "llm"))
+                    continue
+                # score를 float으로 변환하고 0~1 범위로 제한
+                try:
+                    score = max(0.0, min(1.0, float(res.get("score", 0.0))))
+                except (ValueError, TypeError):
+                    score = 0.0
+                results.append({
                     "question": answer["question"],
                     "user_answer": answer["user_answer"],
                     "correct_answer": answer["correct_answer"],
-                    "is_correct": False,
-                    "feedback": "답안 평가 중 오류가 발생했습니다.",
-                    "score": 0.0
+                    "is_correct": bool(res.get("is_correct", False)),
+                    "feedback": res.get("feedback", "평가 실패"),
+                    "score": score
                 })
-            
+
+            total_questions = len(answers)
+            total_score = sum(r["score"] for r in results)
+            score_percentage = (total_score / total_questions) * 100 if total_questions > 0 else 0
+            print(f"[DEBUG] 점수 계산 결과: 총점={total_score}, 문제수={total_questions}, 백분율={score_percentage}%")
             return {
-                "results": default_results,
+                "results": results,
                 "total": {
-                    "total_score": 0,
-                    "total_questions": len(answers),
-                    "score_percentage": 0.0,
-                    "overall_feedback": "답안 평가 중 오류가 발생했습니다."
+                    "total_score": int(total_score),  # 맞은 문제 수
+                    "total_questions": total_questions,
+                    "score_percentage": round(score_percentage, 2),
+                    "overall_feedback": overall_feedback or
+                        f"총 {total_questions}문제 중 {int(total_score)}문제를 맞추었습니다. (정답률: {round(score_percentage, 2)}%)"
                 }
             }
-            
+
         except Exception as e:
             print(f"[ERROR] 답안 평가 중 오류 발생: {str(e)}")
-            # 오류 발생 시 기본 응답 생성
-            default_results = []
-            for answer in answers:
-                default_results.append({
-                    "question": answer["question"],
-                    "user_answer": answer["user_answer"],
-                    "correct_answer": answer["correct_answer"],
-                    "is_correct": False,
-                    "feedback": f"평가 오류: {str(e)}",
-                    "score": 0.0
-                })
-            
-            return {
-                "results": default_results,
-                "total": {
-                    "total_score": 0,
-                    "total_questions": len(answers),
-                    "score_percentage": 0.0,
-                    "overall_feedback": f"답안 평가 중 오류가 발생했습니다: {str(e)}"
-                }
-            }
+            return failed_evaluation(answers, f"평가 오류: {str(e)}")
     
     async def evaluate_single_answer(self, answer: Dict) -> Dict:
-        """단일 답안 평가"""
-        result = await self.evaluate_answers([answer])
-        return result["results"][0] if result["results"] else {
+        """단일 답안 평가 (로컬에서 채점할 수 없으면 다른 요청과 함께 배치로 채점)"""
+        result = grading_service.grade_locally(answer)
+        if result is not None:
+            return result
+        result = await self.single_answer_batcher.submit(answer)
+        return result if result else {
             "question": answer["question"],
             "user_answer": answer["user_answer"],
             "correct_answer": answer["correct_answer"],
@@ -192,44 +227,30 @@ class EvaluatorAgent(BaseAgent):
             "score": 0.0
         }
 
+    async def _evaluate_answer_batch(self, answers: List[Dict]) -> List[Dict]:
+        result = await self.evaluate_answers(answers)
+        return result["results"]
+
     def get_embedding(self, text: str):
         """임베딩 결과 계산"""
-        return self.rag_model.encode(self.preprocess_text(text), convert_to_tensor=True)
+        return embedding_service.encode(text, convert_to_tensor=True)
 
     def preprocess_text(self, text: str) -> str:
         """텍스트 전처리"""
-        return ' '.join(text.split()).replace('•', '')
+        return embedding_service.preprocess_text(text)
 
     async def verify_questions(self, questions: List[Dict], context: str) -> Dict:
         """RAG와 Critic을 통합한 문제 검증 프로세스"""
         try:
-            # 1. RAG 기반 1차 필터링
-            doc_embedding = self.get_embedding(context)
-            rag_filtered_questions = []
-            
-            for question in questions:
-                try:
-                    # 임베딩 계산
-                    q_embedding = self.get_embedding(question["question"])
-                    a_embedding = self.get_embedding(question["correct_answer"])
-                    e_embedding = self.get_embedding(question["explanation"])
-                    
-                    # 유사도 계산
-                    similarities = {
-                        "question": float(torch.cosine_similarity(doc_embedding.unsqueeze(0), q_embedding.unsqueeze(0))),
-                        "answer": float(torch.cosine_similarity(doc_embedding.unsqueeze(0), a_embedding.unsqueeze(0))),
-                        "explanation": float(torch.cosine_similarity(doc_embedding.unsqueeze(0), e_embedding.unsqueeze(0)))
-                    }
-                    
-                    avg_similarity = sum(similarities.values()) / 3
-                    if avg_similarity >= 0.4:  # 1차 필터링 임계값
-                        rag_filtered_questions.append({
-                            **question,
-                            "semantic_similarity": avg_similarity
-                        })
-                except Exception as e:
-                    print(f"[DEBUG] 개별 문제 RAG 검증 중 오류: {str(e)}")
-                    continue
+            # 1. RAG 기반 1차 필터링 (문서 전체 임베딩과의 평균 유사도)
+            doc_embedding = await cpu_executor.run(embedding_service.encode, context, convert_to_tensor=True)
+            rag_filtered_questions = await cpu_executor.run(
+                scoring_service.filter_questions,
+                questions,
+                doc_embedding.unsqueeze(0),
+                weights=(1 / 3, 1 / 3, 1 / 3),
+                threshold=0.4  # 1차 필터링 임계값
+            )
             
             print(f"[DEBUG] RAG 필터링 결과: {len(rag_filtered_questions)}개 통과")
             
@@ -265,8 +286,8 @@ class EvaluatorAgent(BaseAgent):
     }}
 }}"""
 
-                response = self.model.generate_content(prompt)
-                verification_result = json.loads(response.text)
+                response_text = await self.llm.generate(prompt, model=self.model_name)
+                verification_result = json.loads(response_text)
                 
                 # 검증 결과 처리
                 final_questions = []
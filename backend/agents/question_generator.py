@@ -1,16 +1,55 @@
-from typing import Dict, Any, List
-import google.generativeai as genai
+from typing import Dict, Any, List, Optional
+import asyncio
 import json
+import os
+import numpy as np
 from .base import BaseAgent
-from PyPDF2 import PdfReader
+from services import pdf_extraction, chunking, embedding_service, cpu_executor
+from services.embedding_service import preprocess_text
+from services.llm_client import get_llm_client
 from fastapi import UploadFile
 import re
 
+# 생성할 문제 수
+QUESTION_COUNT = 3
+# 이 길이(문자 수)를 넘는 문서는 map-reduce 방식으로 문제 생성
+QUESTION_MAPREDUCE_MIN_CHARS = int(os.getenv("QUESTION_MAPREDUCE_MIN_CHARS", "12000"))
+# 개념 추출(map) 프롬프트 하나에 넣는 최대 문자 수
+QUESTION_GROUP_MAX_CHARS = int(os.getenv("QUESTION_GROUP_MAX_CHARS", "6000"))
+# 개념 추출(map) 호출 수 상한 (그룹이 더 많으면 문서 전체에서 고르게 선택)
+QUESTION_MAX_GROUPS = int(os.getenv("QUESTION_MAX_GROUPS", "16"))
+# 개념별 문제 생성 프롬프트에 넣는 관련 청크 수
+QUESTION_CONTEXT_CHUNKS = int(os.getenv("QUESTION_CONTEXT_CHUNKS", "6"))
+
+def split_chunks(text: str) -> List[chunking.Chunk]:
+    """임베딩 모델 토큰 기준 청크 목록 (CPU 실행기에서 실행)"""
+    return list(chunking.iter_chunks(text))
+
+def select_contexts(concepts: List[Dict], chunk_texts: List[str]) -> List[str]:
+    """개념마다 임베딩 유사도가 높은 청크 QUESTION_CONTEXT_CHUNKS개를 문서 순서대로 이어 붙임
+
+    업로드 때 임베딩된 청크는 임베딩 저장소에서 바로 조회된다. (CPU 실행기에서 실행)
+    """
+    concept_embs = embedding_service.encode_batch(
+        [f"{c['concept']}: {c.get('description', '')}" for c in concepts]
+    )
+    chunk_embs = embedding_service.encode_batch(chunk_texts, preprocess=False)
+    concept_embs = concept_embs / np.linalg.norm(concept_embs, axis=1, keepdims=True).clip(min=1e-12)
+    chunk_embs = chunk_embs / np.linalg.norm(chunk_embs, axis=1, keepdims=True).clip(min=1e-12)
+    similarities = concept_embs @ chunk_embs.T
+
+    contexts = []
+    for row in similarities:
+        top = np.argsort(-row)[:QUESTION_CONTEXT_CHUNKS]
+        contexts.append("\n...\n".join(chunk_texts[i] for i in sorted(top)))
+    return contexts
+
+
 class QuestionGeneratorAgent(BaseAgent):
     def __init__(self, api_key: str):
         super().__init__("question_generator")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.llm = get_llm_client(api_key)
+        self.model_name = 'gemini-2.0-flash'
     
     async def execute_function(self, function_name: str, arguments: Dict[str, Any]) -> Any:
         if function_name == "generate_questions":
@@ -20,22 +59,132 @@ class QuestionGeneratorAgent(BaseAgent):
         raise ValueError(f"Unknown function: {function_name}")
     
     async def extract_text(self, file: UploadFile) -> str:
-        """PDF에서 텍스트 추출"""
-        pdf = PdfReader(file.file)
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text()
-        return self.preprocess_text(text)
+        """PDF에서 텍스트 추출 (워커 프로세스 풀에서 페이지 범위별 병렬 추출)"""
+        data = await file.read()
+        text, _ = await asyncio.to_thread(pdf_extraction.extract_text, data)
+        return text
     
     def preprocess_text(self, text: str) -> str:
         """텍스트 전처리"""
-        return ' '.join(text.split()).replace('•', '')
+        return preprocess_text(text)
     
     async def generate_questions(self, text: str) -> List[Dict]:
-        """텍스트 기반으로 문제 생성"""
+        """텍스트 기반으로 문제 생성 (긴 문서는 map-reduce 방식)"""
         try:
-            # 1. 핵심 개념 추출
-            concepts_prompt = f"""다음 텍스트에서 핵심 개념들을 추출해주세요.
+            if len(text) > QUESTION_MAPREDUCE_MIN_CHARS:
+                questions = await self._generate_questions_map_reduce(text)
+            else:
+                questions = await self._generate_questions_single(text)
+
+            # 문제 검증
+            validated_questions = [q for q in questions if self._validate_question(q)]
+
+            if not validated_questions:
+                raise ValueError("유효한 문제가 생성되지 않았습니다")
+
+            return validated_questions
+
+        except Exception as e:
+            print(f"문제 생성 중 오류 발생: {str(e)}")
+            return []
+
+    async def _generate_questions_single(self, text: str) -> List[Dict]:
+        """문서 전체를 한 번에 프롬프트에 넣어 개념 추출 -> 문제 생성"""
+        # 1. 핵심 개념 추출
+        concepts = await self._extract_concepts(text)
+
+        # 2. 문제 생성
+        return await self._request_questions(concepts, text, QUESTION_COUNT)
+
+    async def _generate_questions_map_reduce(self, text: str) -> List[Dict]:
+        """긴 문서용 문제 생성
+
+        map: 청크 그룹별로 핵심 개념을 동시에 추출
+        reduce: 같은 개념을 합쳐 중요도 순으로 QUESTION_COUNT개 선택
+        생성: 개념마다 임베딩 유사도가 높은 청크만 모아 문제를 동시에 생성
+        프롬프트 크기와 호출 수는 문서 길이와 관계없이 그룹/청크 수 설정으로 제한된다.
+        """
+        chunks = await cpu_executor.run(split_chunks, text)
+        groups = self._group_chunks(text, chunks)
+        if len(groups) > QUESTION_MAX_GROUPS:
+            step = len(groups) / QUESTION_MAX_GROUPS
+            groups = [groups[int(i * step)] for i in range(QUESTION_MAX_GROUPS)]
+        print(f"[DEBUG] map-reduce 문제 생성: 청크 {len(chunks)}개, 개념 추출 그룹 {len(groups)}개")
+
+        # 1. map - 그룹별 개념 추출 (실패한 그룹은 제외)
+        results = await asyncio.gather(*(self._extract_concepts(g) for g in groups), return_exceptions=True)
+        concept_lists = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"[DEBUG] 청크 그룹 개념 추출 실패: {str(result)}")
+                continue
+            concept_lists.append(result)
+
+        # 2. reduce - 개념 병합 및 순위
+        concepts = self._merge_concepts(concept_lists)[:QUESTION_COUNT]
+        if not concepts:
+            raise ValueError("핵심 개념을 추출하지 못했습니다")
+
+        # 3. 개념별 관련 청크 선택 후 문제 생성 (개념당 1문제)
+        contexts = await cpu_executor.run(select_contexts, concepts, [c.text for c in chunks])
+        results = await asyncio.gather(
+            *(self._request_questions([concept], context, 1) for concept, context in zip(concepts, contexts)),
+            return_exceptions=True
+        )
+        questions = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"[DEBUG] 개념별 문제 생성 실패: {str(result)}")
+                continue
+            questions.extend(result)
+        return questions
+
+    def _group_chunks(self, text: str, chunks: List[chunking.Chunk]) -> List[str]:
+        """연속된 청크를 QUESTION_GROUP_MAX_CHARS 이하의 원문 구간으로 묶음 (오버랩 중복 없이)"""
+        groups = []
+        group_start = group_end = None
+        for chunk in chunks:
+            if group_start is not None and chunk.end - group_start > QUESTION_GROUP_MAX_CHARS:
+                groups.append(text[group_start:group_end])
+                group_start = None
+            if group_start is None:
+                group_start = chunk.start
+            group_end = chunk.end
+        if group_start is not None:
+            groups.append(text[group_start:group_end])
+        return groups
+
+    def _merge_concepts(self, concept_lists: List[List[Dict]]) -> List[Dict]:
+        """이름이 같은 개념을 합치고 (최대 중요도, 등장한 그룹 수) 순으로 정렬"""
+        merged: Dict[str, Dict] = {}
+        for concepts in concept_lists:
+            for c in concepts:
+                name = str(c.get("concept", "")).strip()
+                if not name:
+                    continue
+                key = re.sub(r"\s+", "", name).lower()
+                try:
+                    importance = float(c.get("importance", 0.0))
+                except (TypeError, ValueError):
+                    importance = 0.0
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = {
+                        "concept": name,
+                        "description": c.get("description", ""),
+                        "importance": importance,
+                        "occurrences": 1
+                    }
+                else:
+                    entry["occurrences"] += 1
+                    if importance > entry["importance"]:
+                        entry["importance"] = importance
+                        entry["description"] = c.get("description", entry["description"])
+        return sorted(merged.values(), key=lambda c: (c["importance"], c["occurrences"]), reverse=True)
+
+    async def _extract_concepts(self, text: str) -> List[Dict]:
+        """텍스트에서 핵심 개념 추출"""
+        concepts_prompt = f"""다음 텍스트에서 핵심 개념들을 추출해주세요.
 
 텍스트:
 {text}
@@ -50,13 +199,30 @@ class QuestionGeneratorAgent(BaseAgent):
         }}
     ]
 }}"""
-            
-            concepts_response = self.model.generate_content(concepts_prompt)
-            concepts_json = self._clean_json_response(concepts_response.text)
-            concepts = json.loads(concepts_json).get("concepts", [])
-            
-            # 2. 문제 생성
-            questions_prompt = f"""다음 핵심 개념들을 바탕으로 문제를 생성해주세요.
+
+        # 같은 텍스트의 개념 추출 결과는 재사용 (파싱되는 응답만 캐시)
+        concepts_response = await self.llm.generate(
+            concepts_prompt,
+            model=self.model_name,
+            cache=True,
+            validate=lambda response: self._parse_concepts(response) is not None
+        )
+        concepts = self._parse_concepts(concepts_response)
+        if concepts is None:
+            raise ValueError("핵심 개념 응답을 JSON으로 파싱할 수 없습니다.")
+        return concepts
+
+    def _parse_concepts(self, response: str) -> Optional[List[Dict]]:
+        """개념 추출 응답의 concepts 목록 (JSON 형식이 아니면 None)"""
+        try:
+            concepts = json.loads(self._clean_json_response(response)).get("concepts", [])
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            return None
+        return concepts if isinstance(concepts, list) else None
+
+    async def _request_questions(self, concepts: List[Dict], text: str, count: int) -> List[Dict]:
+        """핵심 개념과 텍스트를 바탕으로 count개의 객관식 문제 생성 (검증 전)"""
+        questions_prompt = f"""다음 핵심 개념들을 바탕으로 문제를 생성해주세요.
 
 핵심 개념:
 {json.dumps(concepts, ensure_ascii=False, indent=2)}
@@ -65,7 +231,7 @@ class QuestionGeneratorAgent(BaseAgent):
 {text}
 
 다음 지침을 엄격히 따라주세요:
-1. 정확히 3개의 객관식 문제를 생성하세요.
+1. 정확히 {count}개의 객관식 문제를 생성하세요.
 2. 각 문제는 반드시 텍스트 내용과 추출된 핵심 개념에 기반해야 합니다.
 3. 각 문제는 4개의 보기를 가져야 합니다.
 4. 정답은 반드시 보기 중 하나여야 합니다.
@@ -88,26 +254,11 @@ class QuestionGeneratorAgent(BaseAgent):
         }}
     ]
 }}"""
-            
-            questions_response = self.model.generate_content(questions_prompt)
-            questions_json = self._clean_json_response(questions_response.text)
-            result = json.loads(questions_json)
-            
-            # 3. 문제 검증
-            validated_questions = []
-            for q in result.get("questions", []):
-                if self._validate_question(q):
-                    validated_questions.append(q)
-            
-            if not validated_questions:
-                raise ValueError("유효한 문제가 생성되지 않았습니다")
-            
-            return validated_questions
-            
-        except Exception as e:
-            print(f"문제 생성 중 오류 발생: {str(e)}")
-            return []
-    
+
+        questions_response = await self.llm.generate(questions_prompt, model=self.model_name)
+        questions_json = self._clean_json_response(questions_response)
+        return json.loads(questions_json).get("questions", [])
+
     def _clean_json_response(self, response: str) -> str:
         """JSON 응답 문자열 정제"""
         if isinstance(response, str):
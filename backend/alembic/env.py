@@ -1,29 +1,42 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from alembic import context
 
+from db.engine import DB_CONNECT_TIMEOUT_SECONDS
+from models.base import BaseDB1, BaseDB2
+import models.document  # noqa: F401 (BaseDB1 메타데이터에 테이블 등록)
+import models.vector_doc  # noqa: F401
+import models.question  # noqa: F401 (BaseDB2 메타데이터에 테이블 등록)
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
+# (서버 시작 시 실행될 때 uvicorn 로거가 꺼지지 않도록 기존 로거는 유지)
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# alembic.ini 섹션 이름(--name)으로 대상 DB 선택
+DATABASE = config.config_ini_section
+TARGET_METADATA = {"db1": BaseDB1.metadata, "db2": BaseDB2.metadata}
+target_metadata = TARGET_METADATA[DATABASE]
+
+# 여러 워커가 동시에 시작해도 마이그레이션은 한 번만 실행되도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 8_240_024
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
 
-# other values from the config, defined by the needs of env.py,
-# can be acquired:
-# my_important_option = config.get_main_option("my_important_option")
-# ... etc.
+def get_url() -> str:
+    if DATABASE == "db1":
+        from db.db1 import DB1_URL
+        return DB1_URL
+    from db.db2 import DB2_URL
+    return DB2_URL
 
 
 def run_migrations_offline() -> None:
@@ -38,9 +51,8 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=get_url(),
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
@@ -50,26 +62,35 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode.
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
 
-    In this scenario we need to create an Engine
+    with context.begin_transaction():
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """In this scenario we need to create an Engine
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
+    connectable = create_async_engine(
+        get_url(),
         poolclass=pool.NullPool,
+        # 인덱스 생성 등은 오래 걸릴 수 있으므로 statement_timeout 해제 (서버 기본값과 관계없이)
+        connect_args={"timeout": DB_CONNECT_TIMEOUT_SECONDS, "server_settings": {"statement_timeout": "0"}},
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
 
-        with context.begin_transaction():
-            context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode."""
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
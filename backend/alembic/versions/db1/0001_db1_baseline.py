@@ -0,0 +1,105 @@
+"""db1 baseline: documents, document_chunks, ingestion_jobs, vector_documents
+
+init_db()가 create_all + 수동 DDL로 만들던 스키마. 이미 그렇게 만들어진 DB에서는
+없는 테이블/컬럼/인덱스만 추가하므로 그대로 이 리비전부터 관리할 수 있다.
+
+Revision ID: 0001_db1_baseline
+Revises:
+Create Date: 2026-10-17 01:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_db1_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "documents" not in tables:
+        op.create_table(
+            "documents",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("user_id", sa.String()),
+            sa.Column("filename", sa.String()),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+    if "document_chunks" not in tables:
+        op.create_table(
+            "document_chunks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.String()),
+            sa.Column("document_id", sa.String()),
+            sa.Column("chunk_text", sa.Text()),
+            sa.Column("embedding", pgvector.sqlalchemy.Vector(768)),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+    if "ingestion_jobs" not in tables:
+        op.create_table(
+            "ingestion_jobs",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("user_id", sa.String(), index=True),
+            sa.Column("document_id", sa.String()),
+            sa.Column("filename", sa.String()),
+            sa.Column("file_path", sa.String()),
+            sa.Column("status", sa.String(), index=True),
+            sa.Column("pages_extracted", sa.Integer()),
+            sa.Column("chunks_total", sa.Integer()),
+            sa.Column("chunks_embedded", sa.Integer()),
+            sa.Column("attempts", sa.Integer()),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("timings", postgresql.JSONB(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+    if "vector_documents" not in tables:
+        op.create_table(
+            "vector_documents",
+            sa.Column("id", sa.Integer(), primary_key=True, index=True),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("embedding", pgvector.sqlalchemy.Vector(768), nullable=False),
+        )
+    else:
+        # JSON 문자열로 저장하던 기존 vector_documents 테이블을 pgvector 컬럼으로 변환
+        op.execute(
+            "DO $$ BEGIN "
+            "IF (SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'vector_documents' AND column_name = 'embedding') = 'text' THEN "
+            "ALTER TABLE vector_documents ALTER COLUMN embedding TYPE vector(768) USING embedding::vector; "
+            "END IF; END $$"
+        )
+
+    op.execute("ALTER TABLE vector_documents ADD COLUMN IF NOT EXISTS user_id VARCHAR")
+    op.execute("ALTER TABLE vector_documents ADD COLUMN IF NOT EXISTS document_id VARCHAR")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_vector_documents_user_id ON vector_documents (user_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_vector_documents_document_id ON vector_documents (document_id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_vector_documents_embedding_hnsw "
+        "ON vector_documents USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    )
+
+    # 중복 업로드 감지용 내용 해시
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR")
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS source_document_id VARCHAR")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_documents_content_hash ON documents (content_hash)")
+    op.execute("ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("vector_documents")
+    op.drop_table("ingestion_jobs")
+    op.drop_table("document_chunks")
+    op.drop_table("documents")
@@ -0,0 +1,59 @@
+"""document_chunks: document_id index, cascading FK to documents, orphan cleanup
+
+- documents.ready: 인제스트 중인 문서 행을 청크보다 먼저 만들 수 있도록 추가
+- 끝나지 않은 인제스트 작업의 청크는 숨김 문서 행을 만들어 보존 (재시도 시 이어서 처리)
+- 어떤 문서에도 속하지 않는 청크 삭제 (삭제된 문서에 남아 있던 청크)
+- (document_id, id) 인덱스와 ON DELETE CASCADE 외래 키 추가
+
+Revision ID: 0002_chunk_document_fk
+Revises: 0001_db1_baseline
+Create Date: 2026-10-17 01:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_chunk_document_fk'
+down_revision: Union[str, None] = '0001_db1_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "documents",
+        sa.Column("ready", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+
+    op.execute(
+        "INSERT INTO documents (id, user_id, filename, content_hash, ready) "
+        "SELECT DISTINCT ON (j.document_id) j.document_id, j.user_id, j.filename, j.content_hash, false "
+        "FROM ingestion_jobs j "
+        "WHERE j.status <> 'done' "
+        "AND EXISTS (SELECT 1 FROM document_chunks c WHERE c.document_id = j.document_id) "
+        "AND NOT EXISTS (SELECT 1 FROM documents d WHERE d.id = j.document_id)"
+    )
+    op.execute(
+        "DELETE FROM document_chunks c "
+        "WHERE c.document_id IS NULL "
+        "OR NOT EXISTS (SELECT 1 FROM documents d WHERE d.id = c.document_id)"
+    )
+
+    op.create_index("ix_document_chunks_document_id", "document_chunks", ["document_id", "id"])
+    op.create_foreign_key(
+        "fk_document_chunks_document_id",
+        "document_chunks", "documents",
+        ["document_id"], ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("fk_document_chunks_document_id", "document_chunks", type_="foreignkey")
+    op.drop_index("ix_document_chunks_document_id", table_name="document_chunks")
+    op.drop_column("documents", "ready")
@@ -0,0 +1,32 @@
+"""documents.text_zst: zstd-compressed extracted text
+
+문제 생성 시 겹치는 청크를 이어 붙이는 대신 원문을 한 번만 읽도록 저장한다.
+기존 문서는 NULL로 두고, 읽을 때 청크 텍스트에서 복원한다.
+
+Revision ID: 0003_document_text_zst
+Revises: 0002_chunk_document_fk
+Create Date: 2026-10-17 01:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_document_text_zst'
+down_revision: Union[str, None] = '0002_chunk_document_fk'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("documents", sa.Column("text_zst", sa.LargeBinary(), nullable=True))
+    # 이미 압축된 값이므로 TOAST의 pglz 재압축을 건너뜀
+    op.execute("ALTER TABLE documents ALTER COLUMN text_zst SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("documents", "text_zst")
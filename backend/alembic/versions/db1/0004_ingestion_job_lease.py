@@ -0,0 +1,29 @@
+"""ingestion_jobs: lease columns so a job is processed by one worker at a time
+
+Revision ID: 0004_ingestion_job_lease
+Revises: 0003_document_text_zst
+Create Date: 2026-10-17 02:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_ingestion_job_lease'
+down_revision: Union[str, None] = '0003_document_text_zst'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ingestion_jobs", sa.Column("lease_owner", sa.String(), nullable=True))
+    op.add_column("ingestion_jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ingestion_jobs", "lease_expires_at")
+    op.drop_column("ingestion_jobs", "lease_owner")
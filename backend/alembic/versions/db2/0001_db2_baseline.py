@@ -0,0 +1,52 @@
+"""db2 baseline: questions
+
+init_db()가 create_all + 수동 DDL로 만들던 스키마. 이미 그렇게 만들어진 DB에서는
+없는 테이블/컬럼/인덱스만 추가하므로 그대로 이 리비전부터 관리할 수 있다.
+
+Revision ID: 0001_db2_baseline
+Revises:
+Create Date: 2026-10-17 01:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_db2_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    if not sa.inspect(op.get_bind()).has_table("questions"):
+        op.create_table(
+            "questions",
+            sa.Column("id", sa.Integer(), primary_key=True, index=True),
+            sa.Column("user_id", sa.String(), index=True),
+            sa.Column("question", sa.Text()),
+            sa.Column("correct_answer", sa.Text()),
+            sa.Column("explanation", sa.Text()),
+            sa.Column("options", postgresql.JSONB(), nullable=True),
+            sa.Column("type", sa.String()),
+            sa.Column("document_name", sa.String()),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+
+    # 유사 문제 검색용 질문 임베딩
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS embedding vector(768)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_questions_embedding_hnsw "
+        "ON questions USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("questions")
@@ -0,0 +1,30 @@
+"""questions: (user_id, created_at) index for per-user newest-first listing
+
+단일 user_id 인덱스는 복합 인덱스의 앞 컬럼으로 대체되므로 삭제한다.
+
+Revision ID: 0002_questions_user_created
+Revises: 0001_db2_baseline
+Create Date: 2026-10-17 01:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_questions_user_created'
+down_revision: Union[str, None] = '0001_db2_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_questions_user_id_created_at", "questions", ["user_id", "created_at"])
+    op.execute("DROP INDEX IF EXISTS ix_questions_user_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_questions_user_id", "questions", ["user_id"])
+    op.drop_index("ix_questions_user_id_created_at", table_name="questions")
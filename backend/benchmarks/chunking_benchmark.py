@@ -0,0 +1,95 @@
+# benchmarks/chunking_benchmark.py
+"""대용량 한국어 텍스트 청크 분할 벤치마크
+
+기존 단어 수 기반 청크 분할과 토크나이저 기반 청크 분할(services/chunking.py)의
+처리 시간, 청크 수, 모델 최대 입력 길이를 넘는(임베딩 시 잘리는) 토큰 비율을 비교한다.
+
+실행 (backend 디렉터리에서):
+    python -m benchmarks.chunking_benchmark --sizes 100000 1000000 5000000
+"""
+import argparse
+import random
+import re
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import chunking, embedding_service  # noqa: E402
+
+SAMPLE_SENTENCES = [
+    "데이터베이스는 여러 사람이 공유하여 사용할 목적으로 통합하여 관리되는 데이터의 집합이다",
+    "트랜잭션은 데이터베이스의 상태를 변화시키기 위해 수행하는 작업의 단위를 뜻한다",
+    "정규화는 관계형 데이터베이스의 설계에서 중복을 최소화하게 데이터를 구조화하는 프로세스이다",
+    "인덱스는 테이블의 검색 속도를 향상시키기 위한 자료구조로 B-트리가 널리 사용된다",
+    "운영체제는 하드웨어와 응용 프로그램 사이에서 자원을 관리하고 서비스를 제공한다",
+    "프로세스 스케줄링은 CPU를 어떤 프로세스에 언제 할당할지 결정하는 작업이다",
+    "교착 상태는 둘 이상의 프로세스가 서로가 가진 자원을 기다리며 무한히 대기하는 상황이다",
+    "가상 메모리는 실제 물리 메모리보다 큰 주소 공간을 프로그램에 제공하는 기법이다",
+]
+
+
+def make_korean_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        sentence = rng.choice(SAMPLE_SENTENCES) + rng.choice([".", ".", ".", "!", "?"]) + " "
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def legacy_chunks(text: str, chunk_size: int = 450, overlap: int = 100):
+    """기존 main.create_overlapping_chunks (단어 수 기준) - 비교용"""
+    sentences = [s.strip() for s in re.split('[.!?]', text) if s.strip()]
+    chunks, current_chunk, current_length = [], [], 0
+    for sentence in sentences:
+        sentence_length = len(sentence.split())
+        if current_length + sentence_length <= chunk_size:
+            current_chunk.append(sentence)
+            current_length += sentence_length
+        else:
+            if current_chunk:
+                chunks.append('. '.join(current_chunk) + '.')
+            current_chunk = current_chunk[-(overlap // 20):].copy() if overlap > 0 and current_chunk else []
+            current_chunk.append(sentence)
+            current_length = sentence_length
+    if current_chunk:
+        chunks.append('. '.join(current_chunk) + '.')
+    return chunks
+
+
+def truncated_ratio(tokenizer, chunks, max_tokens: int) -> float:
+    """청크 토큰 중 모델 최대 입력 길이를 넘어 임베딩되지 않는 토큰 비율"""
+    total = dropped = 0
+    for chunk in chunks:
+        n = len(tokenizer(chunk, add_special_tokens=False, verbose=False)["input_ids"])
+        total += n
+        dropped += max(0, n - max_tokens)
+    return dropped / total if total else 0.0
+
+
+def run(sizes, repeat: int):
+    tokenizer = embedding_service.get_tokenizer()
+    max_tokens = embedding_service.get_max_tokens()
+    print(f"모델: {embedding_service.EMBEDDING_MODEL_NAME} (최대 입력 {max_tokens} 토큰)")
+    print(f"{'문자 수':>10} | {'방식':<8} | {'시간(s)':>8} | {'청크 수':>7} | {'잘리는 토큰':>10}")
+    for size in sizes:
+        text = make_korean_text(size)
+        for name, fn in (("legacy", legacy_chunks), ("token", chunking.chunk_texts)):
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                chunks = fn(text)
+                best = min(best, time.perf_counter() - started)
+            ratio = truncated_ratio(tokenizer, chunks, max_tokens)
+            print(f"{size:>10} | {name:<8} | {best:>8.3f} | {len(chunks):>7} | {ratio:>10.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -1,16 +1,21 @@
 # create_db.py
 import asyncio
-from db.db1 import engine_db1
-from db.db2 import engine_db2
-from models.vector_doc import Base as BaseDB1
-from models.question import Base as BaseDB2
+import os
+from alembic import command
+from alembic.config import Config
 
-async def init_db():
-    async with engine_db1.begin() as conn:
-        await conn.run_sync(BaseDB1.meta.create_all)
+# 스키마는 alembic 마이그레이션으로 관리 (alembic.ini의 [db1], [db2] 섹션)
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+DATABASES = ("db1", "db2")
+
+def upgrade_database(name: str):
+    """DB 하나를 최신 리비전까지 마이그레이션 (env.py가 자체 이벤트 루프를 사용하므로 별도 스레드에서 호출)"""
+    command.upgrade(Config(ALEMBIC_INI, ini_section=name), "head")
 
-    async with engine_db2.begin() as conn:
-        await conn.run_sync(BaseDB2.meta.create_all)
+async def init_db():
+    for name in DATABASES:
+        await asyncio.to_thread(upgrade_database, name)
+        print(f"[DEBUG] {name} 마이그레이션 완료")
 
 if __name__ == "__main__":
     asyncio.run(init_db())
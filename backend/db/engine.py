@@ -0,0 +1,73 @@
+# db/engine.py
+import os
+from typing import Dict
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+# 커넥션 풀 설정 (워커 프로세스마다 적용, DB의 max_connections를 넘지 않게 조정)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"))
+# 쿼리 하나의 최대 실행 시간 (마이그레이션은 alembic/env.py가 만드는 별도 엔진에서 제한 없이 실행)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+
+# user_id/document_id로 거르는 벡터 검색의 HNSW 탐색 후보 수
+# (필터는 HNSW가 ef_search개 후보를 찾은 뒤 적용되므로, 다른 사용자 행이 많으면 결과가 빠질 수 있음, 최대 1000)
+HNSW_FILTERED_EF_SEARCH = min(int(os.getenv("HNSW_FILTERED_EF_SEARCH", "400")), 1000)
+# pgvector 0.8 이상: 필터 후 결과가 LIMIT보다 적으면 인덱스를 이어서 탐색 (off / relaxed_order / strict_order)
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "off")
+
+_checkouts: Dict[int, int] = {}
+
+
+def make_engine(url: str) -> AsyncEngine:
+    """풀 크기, pre-ping, 연결/쿼리 제한 시간을 적용한 비동기 엔진"""
+    engine = create_async_engine(
+        url,
+        echo=DB_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        connect_args={
+            "timeout": DB_CONNECT_TIMEOUT_SECONDS,
+            "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+        },
+    )
+    _checkouts[id(engine.sync_engine)] = 0
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+        _checkouts[id(engine.sync_engine)] += 1
+
+    return engine
+
+
+def make_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+
+def pool_status(engine: AsyncEngine) -> Dict:
+    """풀 크기, 사용 중/대기 중인 연결 수, 초과 연결 수, 누적 체크아웃 수"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checkouts": _checkouts.get(id(engine.sync_engine), 0),
+    }
+
+
+async def set_hnsw_search(session, ef_search: int, filtered: bool = False):
+    """현재 트랜잭션에 HNSW 검색 설정 적용 (SET LOCAL, 필터가 있으면 후보 수를 늘리고 반복 탐색 사용)"""
+    if filtered:
+        ef_search = max(ef_search, HNSW_FILTERED_EF_SEARCH)
+        if HNSW_ITERATIVE_SCAN in ("relaxed_order", "strict_order"):
+            await session.execute(text(f"SET LOCAL hnsw.iterative_scan = {HNSW_ITERATIVE_SCAN}"))
+    await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
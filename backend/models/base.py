@@ -0,0 +1,5 @@
+from sqlalchemy.orm import declarative_base
+
+# DB1: 문서/청크/벡터, DB2: 문제
+BaseDB1 = declarative_base()
+BaseDB2 = declarative_base()
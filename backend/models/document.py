@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, LargeBinary, ForeignKey, Index, true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from models.base import BaseDB1
+
+#문서 메타 정보
+class Document(BaseDB1):
+    __tablename__ = "documents"
+    id = Column(String, primary_key=True)  # UUID
+    user_id = Column(String)
+    filename = Column(String)
+    content_hash = Column(String, index=True)  # 원본 PDF의 SHA-256 (같은 파일 재업로드 감지)
+    source_document_id = Column(String, nullable=True)  # 청크를 공유하는 원본 문서 ID (직접 청크를 가진 문서는 None)
+    text_zst = deferred(Column(LargeBinary, nullable=True))  # zstd로 압축한 추출 원문 (문제 생성 시에만 로드)
+    ready = Column(Boolean, nullable=False, default=True, server_default=true())  # 인제스트 중인 문서는 False (목록/중복 검사에서 제외)
+    created_at = Column(DateTime, server_default=func.now())
+
+#문서 청크 + 임베딩 저장
+class DocumentChunk(BaseDB1):
+    __tablename__ = "document_chunks"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String)
+    document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE", name="fk_document_chunks_document_id"))  # 문서 삭제 시 청크도 삭제
+    chunk_text = Column(Text)
+    embedding = Column(Vector(768))  # SentenceTransformer 출력 차원
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # 문서별 청크를 저장 순서대로 조회 (정렬 없이 인덱스 순서로 읽음)
+        Index("ix_document_chunks_document_id", "document_id", "id"),
+    )
+
+#PDF 업로드(인제스트) 작업 상태
+class IngestionJob(BaseDB1):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True)  # UUID
+    user_id = Column(String, index=True)
+    document_id = Column(String)  # 완료 시 생성될 문서 ID
+    filename = Column(String)
+    file_path = Column(String)  # 스풀 디렉터리에 저장된 원본 PDF
+    content_hash = Column(String)
+    status = Column(String, default="queued", index=True)  # queued / extracting / embedding / done / failed
+    pages_extracted = Column(Integer, default=0)
+    chunks_total = Column(Integer, default=0)
+    chunks_embedded = Column(Integer, default=0)  # 커밋이 끝난 청크 수 (재시도 시 이어서 처리)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    lease_owner = Column(String, nullable=True)  # 작업을 처리 중인 워커 (main.WORKER_ID)
+    lease_expires_at = Column(DateTime, nullable=True)  # 이 시각까지 갱신이 없으면 다른 워커가 가져갈 수 있음
+    timings = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,13 +1,31 @@
-from sqlalchemy import Column, Integer, Text, JSON
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from models.base import BaseDB2
 
-Base = declarative_base()
-
-class Question(Base):
+class Question(BaseDB2):
     __tablename__ = "questions"
-
     id = Column(Integer, primary_key=True, index=True)
-    question = Column(Text, nullable=False)
-    correct_answer = Column(Text, nullable=False)
+    user_id = Column(String)
+    question = Column(Text)
+    correct_answer = Column(Text)
     explanation = Column(Text)
-    metadata = Column(JSON)  # (검증 결과, 생성 정보 등 저장용)
\ No newline at end of file
+    options = Column(JSONB, nullable=True)
+    type = Column(String)
+    document_name = Column(String)
+    embedding = deferred(Column(Vector(768), nullable=True))  # 유사 문제 검색용 질문 임베딩 (목록 조회 시 로드하지 않음)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # 사용자별 최신순 목록 조회
+        Index("ix_questions_user_id_created_at", "user_id", "created_at"),
+        Index(
+            "ix_questions_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
@@ -1,11 +1,27 @@
-from sqlalchemy import Column, Integer, Text, String
-from sqlalchemy.ext.declarative import declarative_base
+import os
+from sqlalchemy import Column, Integer, Text, String, Index
+from pgvector.sqlalchemy import Vector
+from models.base import BaseDB1
 
-Base = declarative_base()
+# HNSW 인덱스 튜닝 값 (인덱스 생성 시 적용)
+HNSW_M = int(os.getenv("RAG_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
 
-class VectorDocument(Base):
+class VectorDocument(BaseDB1):
     __tablename__ = "vector_documents"
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, index=True, nullable=True)
+    document_id = Column(String, index=True, nullable=True)
     content = Column(Text, nullable=False)
-    embedding = Column(Text, nullable=False)  # 임베딩을 JSON 문자열로 저장
+    embedding = Column(Vector(768), nullable=False)  # ko-sroberta 임베딩 (pgvector)
+
+    __table_args__ = (
+        Index(
+            "ix_vector_documents_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
@@ -0,0 +1,81 @@
+# services/batching.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """동시에 들어온 개별 요청을 짧은 시간 모아 한 번의 배치 호출로 처리
+
+    첫 요청이 들어오고 max_wait초가 지나거나 max_batch_size개가 모이면
+    handler(items)를 호출하고, 결과 리스트(입력과 같은 순서)를 각 요청에 돌려준다.
+    handler가 예외를 던지면 그 배치의 모든 요청에 같은 예외가 전달된다.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait: float = 0.02,
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._running = set()  # 실행 중인 배치 태스크 (가비지 컬렉션 방지)
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        if self._pending:
+            self._timer = asyncio.create_task(self._flush_later())
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self._batches += 1
+        self._items += len(batch)
+        self._max_seen = max(self._max_seen, len(batch))
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"배치 결과 수 불일치: {len(results)} != {len(batch)}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        """배치 수, 처리한 요청 수, 평균/최대 배치 크기"""
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "largest_batch": self._max_seen,
+            "pending": len(self._pending),
+        }
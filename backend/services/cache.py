@@ -0,0 +1,308 @@
+# services/cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+class CacheBackend(ABC):
+    """캐시 저장소 인터페이스 (값은 bytes로 저장)"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """키의 값 (없거나 만료되었으면 None) - 하위 클래스에서 구현"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """값 저장 - 하위 클래스에서 구현"""
+        pass
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """여러 키를 한 번에 조회 (없는 키는 결과에서 제외)"""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None):
+        for key, value in items.items():
+            self.set(key, value, ttl)
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class MemoryLRUBackend(CacheBackend):
+    """바이트 예산을 넘으면 가장 오래 사용하지 않은 항목부터 제거하는 메모리 캐시"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.time():
+                self._remove(key)
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            self._items[key] = (value, time.time() + ttl if ttl else None)
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._items)))
+
+    def _remove(self, key: str):
+        value, _ = self._items.pop(key)
+        self.current_bytes -= len(value)
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._items), "bytes": self.current_bytes, "max_bytes": self.max_bytes}
+
+
+class SQLiteBackend(CacheBackend):
+    """워커 재시작 후에도 유지되는 SQLite 디스크 캐시
+
+    max_entries를 지정하면 항목 수가 이를 넘을 때 가장 오래 사용하지 않은 항목부터 제거한다.
+    """
+
+    # SQLite 바인딩 변수 개수 제한(999) 이하로 IN 조회를 나눔
+    QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, path: str, table: str = "cache", max_entries: Optional[int] = None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_accessed_at ON {table} (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl if ttl else None, now),
+            )
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+            self._evict()
+            self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self.QUERY_CHUNK_SIZE):
+                part = keys[start:start + self.QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM {self.table} WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    if expires_at is None or expires_at >= now:
+                        found[key] = value
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None):
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, value, expires_at, now) for key, value in items.items()],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """max_entries를 넘는 만큼 가장 오래 사용하지 않은 항목 제거 (락을 잡은 상태에서 호출)"""
+        if not self.max_entries:
+            return
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            "entries": count,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "path": self.path,
+        }
+
+
+class LLMResponseCache:
+    """(모델, 프롬프트 해시, temperature)를 키로 하는 LLM 응답 캐시"""
+
+    def __init__(self, backend: CacheBackend, default_ttl: Optional[float] = None):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: Optional[float]) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{model}:{temperature}:{prompt_hash}"
+
+    def get(self, model: str, prompt: str, temperature: Optional[float]) -> Optional[str]:
+        value = self.backend.get(self.make_key(model, prompt, temperature))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode("utf-8")
+
+    def set(self, model: str, prompt: str, temperature: Optional[float], response: str, ttl: Optional[float] = None):
+        self.backend.set(
+            self.make_key(model, prompt, temperature),
+            response.encode("utf-8"),
+            ttl or self.default_ttl,
+        )
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "backend": type(self.backend).__name__,
+            **self.backend.stats(),
+        }
+
+
+class EmbeddingCache:
+    """(모델 버전, 정규화된 텍스트 해시)를 키로 하는 임베딩 저장소 (float32 벡터를 bytes로 저장)"""
+
+    def __init__(self, backend: CacheBackend, model_version: str):
+        self.backend = backend
+        self.model_version = model_version
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """공백과 유니코드 조합 차이만 있는 텍스트가 같은 키를 갖도록 정규화"""
+        return unicodedata.normalize("NFC", " ".join(text.split()))
+
+    def make_key(self, text: str) -> str:
+        text_hash = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"{self.model_version}:{text_hash}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """make_key로 만든 키 목록 중 저장된 임베딩이 있는 것만 {키: 벡터}로 반환"""
+        found = self.backend.get_many(keys)
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return {key: np.frombuffer(value, dtype=np.float32) for key, value in found.items()}
+
+    def set_many(self, items: Dict[str, np.ndarray]):
+        self.backend.set_many({
+            key: np.asarray(vector, dtype=np.float32).tobytes()
+            for key, vector in items.items()
+        })
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "backend": type(self.backend).__name__,
+            **self.backend.stats(),
+        }
+
+
+def create_llm_cache() -> Optional[LLMResponseCache]:
+    """환경 변수 설정에 따라 LLM 응답 캐시 생성 (LLM_CACHE_BACKEND=none이면 비활성화)"""
+    backend_name = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    if backend_name == "none":
+        return None
+    if backend_name == "sqlite":
+        backend = SQLiteBackend(os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3"))
+    else:
+        backend = MemoryLRUBackend(int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+    return LLMResponseCache(backend, default_ttl=ttl)
+
+
+def create_embedding_cache(model_version: str) -> Optional[EmbeddingCache]:
+    """환경 변수 설정에 따라 임베딩 저장소 생성 (EMBEDDING_CACHE_BACKEND=none이면 비활성화)"""
+    backend_name = os.getenv("EMBEDDING_CACHE_BACKEND", "sqlite").lower()
+    if backend_name == "none":
+        return None
+    if backend_name == "memory":
+        backend = MemoryLRUBackend(int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(256 * 1024 * 1024))))
+    else:
+        backend = SQLiteBackend(
+            os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3"),
+            table="embeddings",
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000")),
+        )
+    return EmbeddingCache(backend, model_version)
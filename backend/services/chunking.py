@@ -0,0 +1,99 @@
+# services/chunking.py
+import os
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+from services import embedding_service
+
+# 청크 간 겹치는 토큰 수
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "16"))
+# 청크를 따로 토크나이즈할 때 경계 토큰이 달라질 수 있으므로 남겨두는 여유 토큰 수
+CHUNK_SAFETY_MARGIN_TOKENS = int(os.getenv("CHUNK_SAFETY_MARGIN_TOKENS", "4"))
+
+SENTENCE_END_CHARS = ".!?。"
+
+
+@dataclass
+class Chunk:
+    text: str
+    start: int  # 원본 텍스트 내 시작 문자 위치
+    end: int  # 원본 텍스트 내 끝 문자 위치 (미포함)
+    token_count: int
+
+
+def _sentence_boundary(text: str, offsets, lo: int, hi: int) -> Optional[int]:
+    """[lo, hi) 토큰 구간에서 문장이 끝나는 마지막 토큰 다음 위치 (없으면 None)"""
+    for i in range(hi - 1, lo - 1, -1):
+        char_end = offsets[i][1]
+        if char_end > 0 and text[char_end - 1] in SENTENCE_END_CHARS:
+            return i + 1
+    return None
+
+
+def iter_chunks(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+    tokenizer=None,
+) -> Iterator[Chunk]:
+    """임베딩 모델 토크나이저 기준으로 오버랩 청크를 순서대로 생성
+
+    텍스트는 한 번만 토크나이즈하고 토큰 구간을 앞에서부터 잘라 나가므로 텍스트 길이에 선형이다.
+    각 청크는 max_tokens(기본값: 모델 최대 입력 길이 - 여유분) 이하이고 다음 청크는 이전 청크 끝보다
+    앞에서 시작하므로, 모든 토큰이 잘리지 않고 어떤 청크의 임베딩에 포함된다.
+    가능하면 청크 후반부의 문장 끝에서 자른다.
+    """
+    tokenizer = tokenizer or embedding_service.get_tokenizer()
+    if max_tokens is None:
+        max_tokens = embedding_service.get_max_tokens() - CHUNK_SAFETY_MARGIN_TOKENS
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    encoding = tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        verbose=False,
+    )
+    offsets = encoding["offset_mapping"]
+    total = len(offsets)
+
+    start = 0
+    while start < total:
+        end = min(start + max_tokens, total)
+        if end < total:
+            boundary = _sentence_boundary(text, offsets, start + max_tokens // 2, end)
+            if boundary:
+                end = boundary
+
+        char_start, char_end = offsets[start][0], offsets[end - 1][1]
+        yield Chunk(text=text[char_start:char_end], start=char_start, end=char_end, token_count=end - start)
+
+        if end >= total:
+            break
+        start = max(end - overlap_tokens, start + 1)
+
+
+def chunk_texts(text: str, **kwargs) -> List[str]:
+    """청크 텍스트 목록"""
+    return [chunk.text for chunk in iter_chunks(text, **kwargs)]
+
+
+def merge_chunks(chunks: List[str], min_overlap: int = 20, max_overlap: int = 2000) -> str:
+    """오버랩 청크들을 겹치는 부분 없이 이어 붙여 원문을 복원
+
+    앞 청크의 끝과 다음 청크의 앞부분이 min_overlap자 이상 같으면 그 부분을 한 번만 넣고,
+    겹치는 부분을 찾지 못하면 공백으로 이어 붙인다.
+    """
+    if not chunks:
+        return ""
+    parts = [chunks[0]]
+    prev = chunks[0]
+    for chunk in chunks[1:]:
+        overlap = 0
+        for k in range(min(len(prev), len(chunk), max_overlap), min_overlap - 1, -1):
+            if prev.endswith(chunk[:k]):
+                overlap = k
+                break
+        parts.append(chunk[overlap:] if overlap else " " + chunk)
+        prev = chunk
+    return "".join(parts)
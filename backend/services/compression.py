@@ -0,0 +1,15 @@
+# services/compression.py
+import os
+import zstandard
+
+# 문서 원문 저장용 zstd 압축 레벨 (높을수록 작지만 압축이 느림, 압축 해제 속도는 거의 같음)
+DOCUMENT_TEXT_ZSTD_LEVEL = int(os.getenv("DOCUMENT_TEXT_ZSTD_LEVEL", "10"))
+
+
+def compress_text(text: str, level: int = DOCUMENT_TEXT_ZSTD_LEVEL) -> bytes:
+    """UTF-8 텍스트를 zstd 프레임으로 압축 (원본 크기를 프레임 헤더에 기록)"""
+    return zstandard.ZstdCompressor(level=level).compress(text.encode("utf-8"))
+
+
+def decompress_text(data: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
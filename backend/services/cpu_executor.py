@@ -0,0 +1,72 @@
+# services/cpu_executor.py
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# CPU 작업(임베딩, 유사도 계산) 실행기 설정
+# thread: 같은 프로세스의 스레드 (모델/임베딩 저장소/배처 공유, torch 연산은 GIL을 놓음)
+# process: 별도 프로세스 (워커마다 모델을 로드, 실행 함수와 인자는 pickle 가능해야 함)
+CPU_EXECUTOR = os.getenv("CPU_EXECUTOR", "thread").lower()
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# torch 연산 하나가 사용하는 스레드 수 (0이면 torch 기본값)
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_in_flight = 0
+
+
+def configure_torch_threads(num_threads: int = TORCH_NUM_THREADS):
+    """torch intra-op 스레드 수 설정 (프로세스마다 한 번)"""
+    if num_threads > 0:
+        import torch
+        torch.set_num_threads(num_threads)
+
+
+def get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if CPU_EXECUTOR == "process":
+                _executor = ProcessPoolExecutor(
+                    max_workers=CPU_EXECUTOR_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=configure_torch_threads,
+                    initargs=(TORCH_NUM_THREADS,),
+                )
+            else:
+                _executor = ThreadPoolExecutor(max_workers=CPU_EXECUTOR_WORKERS, thread_name_prefix="cpu")
+        return _executor
+
+
+async def run(func: Callable, *args, **kwargs) -> Any:
+    """CPU 작업을 실행기에서 실행하고 결과를 기다림 (이벤트 루프를 막지 않음)"""
+    global _in_flight
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+    finally:
+        _in_flight -= 1
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def stats() -> Dict:
+    """실행기 종류, 워커 수, 실행/대기 중인 작업 수"""
+    return {
+        "kind": CPU_EXECUTOR,
+        "workers": CPU_EXECUTOR_WORKERS,
+        "torch_threads": TORCH_NUM_THREADS or None,
+        "in_flight": _in_flight,
+    }
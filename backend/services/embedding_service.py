@@ -0,0 +1,239 @@
+# services/embedding_service.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+import numpy as np
+from services.cache import EmbeddingCache, create_embedding_cache
+
+# 프로세스 전체에서 공유하는 임베딩 모델 설정
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "jhgan/ko-sroberta-multitask")
+EMBEDDING_MODEL_REVISION = os.getenv("EMBEDDING_MODEL_REVISION")  # None이면 기본 브랜치
+# 저장된 임베딩 키에 포함 (모델이나 리비전이 바뀌면 이전 임베딩을 사용하지 않음)
+EMBEDDING_MODEL_VERSION = f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_MODEL_REVISION or 'main'}"
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# 동시 요청을 모아 한 번에 추론하는 배처 설정 (EMBEDDING_BATCHING=0이면 호출 스레드에서 바로 추론)
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "1") == "1"
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+EMBEDDING_BATCH_MAX_TEXTS = int(os.getenv("EMBEDDING_BATCH_MAX_TEXTS", "128"))
+
+_model = None
+_model_lock = threading.Lock()
+_cache: Optional[EmbeddingCache] = None
+_cache_initialized = False
+_cache_lock = threading.Lock()
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def preprocess_text(text: str) -> str:
+    """텍스트 전처리"""
+    return ' '.join(text.split()).replace('•', '')
+
+
+def get_model():
+    """SentenceTransformer 모델을 최초 사용 시점에 한 번만 로드하여 반환"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                print(f"[DEBUG] 임베딩 모델 로드: {EMBEDDING_MODEL_NAME}")
+                _model = SentenceTransformer(EMBEDDING_MODEL_NAME, revision=EMBEDDING_MODEL_REVISION)
+    return _model
+
+
+def is_model_loaded() -> bool:
+    return _model is not None
+
+
+def warmup():
+    """모델을 로드하고 한 번 추론해 첫 요청의 지연을 없앰 (임베딩 저장소는 거치지 않음)"""
+    get_model().encode(["워밍업"], batch_size=1)
+
+
+def get_cache() -> Optional[EmbeddingCache]:
+    """텍스트 해시 기반 임베딩 저장소 (EMBEDDING_CACHE_BACKEND=none이면 None)"""
+    global _cache, _cache_initialized
+    if not _cache_initialized:
+        with _cache_lock:
+            if not _cache_initialized:
+                _cache = create_embedding_cache(EMBEDDING_MODEL_VERSION)
+                _cache_initialized = True
+    return _cache
+
+
+def get_cache_stats() -> dict:
+    """임베딩 저장소 적중률과 크기"""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+def get_tokenizer():
+    """임베딩 모델의 토크나이저"""
+    return get_model().tokenizer
+
+
+def get_max_tokens() -> int:
+    """한 번에 임베딩되는 최대 토큰 수 (특수 토큰 제외, 이보다 긴 입력은 잘림)"""
+    model = get_model()
+    special_tokens = model.tokenizer.num_special_tokens_to_add(pair=False)
+    return model.max_seq_length - special_tokens
+
+
+class EmbeddingBatcher:
+    """여러 스레드의 임베딩 요청을 큐에 모아 전용 추론 스레드에서 배치로 계산
+
+    첫 요청 후 max_wait초 동안(또는 텍스트가 max_texts개 모일 때까지) 들어온 요청을 합쳐
+    한 번의 model.encode로 계산하고 요청별로 나눠 돌려준다.
+    모델 추론은 항상 이 스레드 하나에서만 실행된다.
+    """
+
+    def __init__(self, max_wait: float = EMBEDDING_BATCH_MAX_WAIT_MS / 1000, max_texts: int = EMBEDDING_BATCH_MAX_TEXTS):
+        self.max_wait = max_wait
+        self.max_texts = max_texts
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "requests": 0, "texts": 0, "largest_batch": 0, "total_wait_ms": 0.0}
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """텍스트 목록의 임베딩 (추론이 끝날 때까지 호출 스레드를 블로킹)"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((texts, batch_size, future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_texts:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self._run(batch)
+
+    def _run(self, batch: List[tuple]):
+        started = time.perf_counter()
+        texts = [text for item in batch for text in item[0]]
+        stats = self._stats
+        stats["batches"] += 1
+        stats["requests"] += len(batch)
+        stats["texts"] += len(texts)
+        stats["largest_batch"] = max(stats["largest_batch"], len(texts))
+        stats["total_wait_ms"] += sum((started - item[3]) * 1000 for item in batch)
+        try:
+            embeddings = get_model().encode(texts, batch_size=max(item[1] for item in batch))
+        except Exception as e:
+            for item in batch:
+                item[2].set_exception(e)
+            return
+        offset = 0
+        for item_texts, _, future, _ in batch:
+            future.set_result(embeddings[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+    def stats(self) -> Dict:
+        """대기 중인 요청 수, 배치 수, 배치당 평균 텍스트/요청 수, 평균 대기 시간"""
+        stats = self._stats
+        batches = stats["batches"]
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "requests": stats["requests"],
+            "texts": stats["texts"],
+            "avg_texts_per_batch": round(stats["texts"] / batches, 2) if batches else 0.0,
+            "avg_requests_per_batch": round(stats["requests"] / batches, 2) if batches else 0.0,
+            "largest_batch": stats["largest_batch"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / stats["requests"], 2) if stats["requests"] else 0.0,
+        }
+
+
+def get_batcher() -> Optional[EmbeddingBatcher]:
+    global _batcher
+    if not EMBEDDING_BATCHING:
+        return None
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = EmbeddingBatcher()
+        return _batcher
+
+
+def get_batcher_stats() -> dict:
+    """임베딩 배치 큐 지표"""
+    batcher = get_batcher()
+    return batcher.stats() if batcher is not None else {"enabled": False}
+
+
+def _compute(texts: List[str], batch_size: Optional[int]) -> np.ndarray:
+    """모델 추론 (배처가 켜져 있으면 다른 요청과 합쳐서 계산)"""
+    batcher = get_batcher()
+    if batcher is not None:
+        return batcher.encode(texts, batch_size or DEFAULT_BATCH_SIZE)
+    return get_model().encode(texts, batch_size=batch_size or DEFAULT_BATCH_SIZE)
+
+
+def encode(text: str, convert_to_tensor: bool = False, preprocess: bool = True):
+    """단일 텍스트 임베딩"""
+    return encode_batch([text], convert_to_tensor=convert_to_tensor, preprocess=preprocess)[0]
+
+
+def encode_batch(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    convert_to_tensor: bool = False,
+    preprocess: bool = True,
+):
+    """여러 텍스트를 배치 단위로 임베딩 (입력 순서 유지)
+
+    임베딩 저장소에서 한 번에 조회한 뒤, 저장되지 않은 텍스트(중복 제외)만 모델로 계산하고 저장한다.
+    모델 추론은 EmbeddingBatcher를 거쳐 동시에 들어온 다른 요청과 함께 배치로 실행된다.
+    """
+    if preprocess:
+        texts = [preprocess_text(t) for t in texts]
+    if not texts:
+        return get_model().encode(texts, convert_to_tensor=convert_to_tensor)
+
+    cache = get_cache()
+    if cache is None:
+        embeddings = _compute(texts, batch_size)
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(embeddings).to(get_model().device)
+        return embeddings
+
+    keys = [cache.make_key(t) for t in texts]
+    vectors = cache.get_many(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors and key not in missing:
+            missing[key] = text
+    if missing:
+        computed = _compute(list(missing.values()), batch_size)
+        new_vectors = dict(zip(missing.keys(), computed))
+        cache.set_many(new_vectors)
+        vectors.update(new_vectors)
+
+    embeddings = np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+    if convert_to_tensor:
+        import torch
+        return torch.from_numpy(embeddings).to(get_model().device)
+    return embeddings
@@ -0,0 +1,173 @@
+# services/grading_service.py
+import os
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+import numpy as np
+from services import embedding_service
+
+# 보기 번호로 입력한 답안 ("1", "1번", "(1)", "①", "a", "A)" 등)
+OPTION_LABEL_PATTERN = re.compile(r"^\(?([1-9]|[a-z])\s*(?:번|\)|\.)?$")
+CIRCLED_NUMBERS = "①②③④⑤⑥⑦⑧⑨"
+
+# 서술형 답안 임베딩 사전 채점 설정 (유사도가 두 임계값 사이인 답안만 LLM으로 평가)
+GRADING_SEMANTIC_MAX_CHARS = int(os.getenv("GRADING_SEMANTIC_MAX_CHARS", "200"))
+GRADING_ACCEPT_THRESHOLD = float(os.getenv("GRADING_ACCEPT_THRESHOLD", "0.9"))
+GRADING_REJECT_THRESHOLD = float(os.getenv("GRADING_REJECT_THRESHOLD", "0.4"))
+# 자모 단위 문자열 유사도가 이 값 이상이면 오타로 보고 정답 처리
+GRADING_TYPO_RATIO = float(os.getenv("GRADING_TYPO_RATIO", "0.9"))
+# 한쪽에만 있으면 의미가 반대일 수 있어 로컬에서 정답 처리하지 않는 표현
+NEGATION_MARKERS = ("않", "없", "못", "아니", "불가")
+# 붙으면 반대말이 되는 한자어 접두사 (대칭/비대칭, 동기/비동기, 선형/비선형 등)
+NEGATION_PREFIXES = ("비", "무", "불", "반", "미", "역")
+
+
+def normalize_answer(text) -> str:
+    """채점 비교용 정규화 (유니코드 조합, 대소문자, 띄어쓰기, 끝 문장부호 차이 무시)"""
+    text = unicodedata.normalize("NFC", str(text or "")).casefold()
+    text = re.sub(r"\s+", "", text)
+    return text.rstrip(".。!")
+
+
+def _label_index(normalized: str) -> Optional[int]:
+    if len(normalized) == 1 and normalized in CIRCLED_NUMBERS:
+        return CIRCLED_NUMBERS.index(normalized)
+    match = OPTION_LABEL_PATTERN.match(normalized)
+    if not match:
+        return None
+    label = match.group(1)
+    return int(label) - 1 if label.isdigit() else ord(label) - ord("a")
+
+
+def match_option(user_answer, options: List) -> Optional[int]:
+    """답안이 가리키는 보기 인덱스 (보기 내용 또는 보기 번호가 정확히 하나의 보기와 일치할 때만)"""
+    normalized = normalize_answer(user_answer)
+    if not normalized:
+        return None
+    candidates = {i for i, option in enumerate(options) if normalize_answer(option) == normalized}
+    label_index = _label_index(normalized)
+    if label_index is not None and label_index < len(options):
+        candidates.add(label_index)
+    return candidates.pop() if len(candidates) == 1 else None
+
+
+def make_result(answer: Dict, is_correct: bool, score: float, feedback: str, grading: str) -> Dict:
+    return {
+        "question": answer["question"],
+        "user_answer": answer["user_answer"],
+        "correct_answer": answer["correct_answer"],
+        "is_correct": is_correct,
+        "feedback": feedback,
+        "score": score,
+        "grading": grading
+    }
+
+
+def feedback_for(answer: Dict, is_correct: bool) -> str:
+    if is_correct:
+        return "정답입니다."
+    return f"오답입니다. 정답은 '{answer['correct_answer']}'입니다."
+
+
+def grade_locally(answer: Dict) -> Optional[Dict]:
+    """LLM 없이 확정할 수 있는 답안 채점 (확정할 수 없으면 None)
+
+    - 객관식: 답안과 정답이 각각 정확히 하나의 보기로 해석되면 보기 일치 여부로 채점
+    - 그 외: 정규화한 답안이 정답과 같으면 정답 처리
+    """
+    if not answer.get("user_answer"):
+        return None
+
+    options = answer.get("options")
+    if isinstance(options, list) and options:
+        user_index = match_option(answer["user_answer"], options)
+        correct_index = match_option(answer["correct_answer"], options)
+        if user_index is not None and correct_index is not None:
+            is_correct = user_index == correct_index
+            return make_result(answer, is_correct, 1.0 if is_correct else 0.0, feedback_for(answer, is_correct), "local")
+        if answer.get("type") == "multiple_choice":
+            return None
+
+    if normalize_answer(answer["user_answer"]) == normalize_answer(answer["correct_answer"]):
+        return make_result(answer, True, 1.0, feedback_for(answer, True), "local")
+    return None
+
+
+def _jamo(normalized: str) -> str:
+    """한글 음절을 자모로 분해 (한 글자 오타가 문자열 유사도에 미치는 영향을 줄임)"""
+    return unicodedata.normalize("NFD", normalized)
+
+
+def _negations(text: str) -> set:
+    return {marker for marker in NEGATION_MARKERS if marker in text}
+
+
+def _adds_prefix(user: str, correct: str) -> bool:
+    """한쪽에만 부정 접두사가 끼어 있는지 (글자가 더해지거나 빠진 부분이 접두사로 시작)"""
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, user, correct, autojunk=False).get_opcodes():
+        if tag in ("insert", "delete", "replace") and (i2 - i1) != (j2 - j1):
+            added = user[i1:i2] if (i2 - i1) > (j2 - j1) else correct[j1:j2]
+            if added.startswith(NEGATION_PREFIXES):
+                return True
+    return False
+
+
+def _can_accept(user: str, correct: str) -> bool:
+    """숫자나 부정 표현/접두사가 다르면 유사도가 높아도 정답으로 확정하지 않음"""
+    return (
+        re.findall(r"\d+", user) == re.findall(r"\d+", correct)
+        and _negations(user) == _negations(correct)
+        and not _adds_prefix(user, correct)
+    )
+
+
+def grade_semantically(answers: List[Dict]) -> List[Optional[Dict]]:
+    """짧은 서술형 답안을 정답과의 오타 허용 문자열 유사도 / 임베딩 유사도로 사전 채점
+
+    확실히 맞거나 틀린 답안만 결과를 반환하고, 불확실한 구간(GRADING_REJECT_THRESHOLD ~
+    GRADING_ACCEPT_THRESHOLD)이나 대상이 아닌 답안은 None (LLM 평가 대상).
+    임베딩은 한 번의 배치로 계산하므로 이벤트 루프에서는 스레드로 실행한다.
+    """
+    results: List[Optional[Dict]] = [None] * len(answers)
+    candidates = []
+    for i, answer in enumerate(answers):
+        if answer.get("type") == "multiple_choice" or not answer.get("user_answer"):
+            continue
+        user, correct = str(answer["user_answer"]), str(answer["correct_answer"])
+        if len(user) > GRADING_SEMANTIC_MAX_CHARS or len(correct) > GRADING_SEMANTIC_MAX_CHARS:
+            continue
+        user_norm, correct_norm = normalize_answer(user), normalize_answer(correct)
+        if not _can_accept(user_norm, correct_norm):
+            candidates.append((i, False))
+            continue
+        # 오타는 같은 글자 수에서 글자가 바뀐 경우만 인정 (음절이 더해지거나 빠지면 뜻이 달라질 수 있음)
+        typo_ratio = SequenceMatcher(None, _jamo(user_norm), _jamo(correct_norm)).ratio()
+        if len(user_norm) == len(correct_norm) and typo_ratio >= GRADING_TYPO_RATIO:
+            result = make_result(answer, True, 1.0, feedback_for(answer, True), "semantic")
+            result["similarity"] = round(typo_ratio, 3)
+            results[i] = result
+        else:
+            candidates.append((i, True))
+
+    if not candidates:
+        return results
+
+    texts = []
+    for i, _ in candidates:
+        texts.extend([str(answers[i]["user_answer"]), str(answers[i]["correct_answer"])])
+    embeddings = embedding_service.encode_batch(texts)
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+
+    for n, (i, acceptable) in enumerate(candidates):
+        similarity = float(embeddings[2 * n] @ embeddings[2 * n + 1])
+        if similarity >= GRADING_ACCEPT_THRESHOLD and acceptable:
+            is_correct = True
+        elif similarity <= GRADING_REJECT_THRESHOLD:
+            is_correct = False
+        else:
+            continue
+        result = make_result(answers[i], is_correct, 1.0 if is_correct else 0.0, feedback_for(answers[i], is_correct), "semantic")
+        result["similarity"] = round(similarity, 3)
+        results[i] = result
+    return results
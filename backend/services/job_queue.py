@@ -0,0 +1,76 @@
+# services/job_queue.py
+import asyncio
+from typing import Awaitable, Callable, Optional, Tuple, Type
+
+
+class JobQueue:
+    """프로세스 내 비동기 작업 큐
+
+    worker_count개의 워커가 큐에서 job_id를 꺼내 handler(job_id)를 실행한다.
+    handler가 예외를 던지면 retry_delay * 시도 횟수만큼 기다린 뒤 max_retries회까지 재시도하고,
+    그래도 실패하면 on_failure(job_id, error)를 호출한다.
+    fatal_exceptions에 해당하는 예외(재시도해도 결과가 같은 실패)는 재시도 없이 바로 on_failure로 넘긴다.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[None]],
+        on_failure: Optional[Callable[[str, Exception], Awaitable[None]]] = None,
+        worker_count: int = 2,
+        max_retries: int = 2,
+        retry_delay: float = 5.0,
+        fatal_exceptions: Tuple[Type[Exception], ...] = (),
+    ):
+        self.handler = handler
+        self.on_failure = on_failure
+        self.worker_count = worker_count
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.fatal_exceptions = fatal_exceptions
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers = []
+        self._pending = set()
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job_id: str):
+        """작업 등록 (이미 대기/실행 중인 작업은 무시)"""
+        if job_id in self._pending:
+            return
+        self._pending.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._pending.discard(job_id)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                await self.handler(job_id)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR] 작업 {job_id} 실패 ({attempt}/{self.max_retries + 1}회): {str(e)}")
+                if attempt > self.max_retries or isinstance(e, self.fatal_exceptions):
+                    if self.on_failure is not None:
+                        await self.on_failure(job_id, e)
+                    return
+                await asyncio.sleep(self.retry_delay * attempt)
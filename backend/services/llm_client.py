@@ -0,0 +1,163 @@
+# services/llm_client.py
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+from services.cache import LLMResponseCache, create_llm_cache
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# 호출 제한 설정 (API 쿼터에 맞춰 조정)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+
+class TokenBucket:
+    """분당 요청 수를 제한하는 토큰 버킷"""
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class GeminiClient:
+    """모든 에이전트가 공유하는 비동기 Gemini 클라이언트
+
+    호출마다 타임아웃을 적용하고, 전역 동시 호출 수와 분당 호출 수를 제한하며,
+    모델별 호출 지연 시간을 집계한다.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        burst: int = LLM_BURST,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self._configured = False
+        self.timeout = timeout
+        self.cache = cache
+        self._models: Dict[str, Any] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_minute, burst)
+        self._stats = defaultdict(lambda: {
+            "calls": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        })
+
+    def _get_model(self, model_name: str):
+        if model_name not in self._models:
+            # SDK import는 첫 호출 시점까지 미룸 (서버 시작 시간 단축)
+            import google.generativeai as genai
+            if not self._configured:
+                genai.configure(api_key=self.api_key)
+                self._configured = True
+            self._models[model_name] = genai.GenerativeModel(model_name)
+        return self._models[model_name]
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        temperature: Optional[float] = None,
+        timeout: Optional[float] = None,
+        cache: bool = False,
+        cache_ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """프롬프트에 대한 응답 텍스트 반환
+
+        cache=True이면 같은 (모델, 프롬프트, temperature) 요청은 API를 호출하지 않고 캐시된 응답을 반환한다.
+        validate가 있으면 validate(응답)이 True인 응답만 캐시에 저장한다 (파싱할 수 없는 응답이 재사용되지 않도록).
+        """
+        if cache and self.cache is not None:
+            cached = self.cache.get(model, prompt, temperature)
+            if cached is not None:
+                print(f"[DEBUG] Gemini 캐시 적중 ({model})")
+                return cached
+
+        response_text = await self._generate(prompt, model, temperature, timeout)
+
+        if cache and self.cache is not None and (validate is None or validate(response_text)):
+            self.cache.set(model, prompt, temperature, response_text, ttl=cache_ttl)
+        return response_text
+
+    async def _generate(
+        self,
+        prompt: str,
+        model: str,
+        temperature: Optional[float],
+        timeout: Optional[float],
+    ) -> str:
+        generation_config = {"temperature": temperature} if temperature is not None else None
+
+        await self._bucket.acquire()
+        async with self._semaphore:
+            stats = self._stats[model]
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self._get_model(model).generate_content_async(prompt, generation_config=generation_config),
+                    timeout=timeout or self.timeout,
+                )
+                return response.text
+            except asyncio.TimeoutError:
+                stats["timeouts"] += 1
+                raise
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                latency_ms = (time.perf_counter() - started) * 1000
+                stats["calls"] += 1
+                stats["total_latency_ms"] += latency_ms
+                stats["max_latency_ms"] = max(stats["max_latency_ms"], latency_ms)
+                print(f"[DEBUG] Gemini 호출 ({model}): {latency_ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """모델별 호출 수, 오류 수, 평균/최대 지연 시간"""
+        return {
+            model: {
+                **stats,
+                "avg_latency_ms": round(stats["total_latency_ms"] / stats["calls"], 1) if stats["calls"] else 0.0,
+            }
+            for model, stats in self._stats.items()
+        }
+
+    def get_cache_stats(self) -> Dict:
+        """응답 캐시 적중/미스 수"""
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+
+
+_client: Optional[GeminiClient] = None
+
+
+def get_llm_client(api_key: Optional[str] = None) -> GeminiClient:
+    """프로세스 전체에서 하나의 GeminiClient 인스턴스를 공유"""
+    global _client
+    if _client is None:
+        _client = GeminiClient(api_key=api_key, cache=create_llm_cache())
+    return _client
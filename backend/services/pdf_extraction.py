@@ -0,0 +1,174 @@
+# services/pdf_extraction.py
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple, Union
+from services.embedding_service import preprocess_text
+
+# 추출 작업 설정 (워커 프로세스 단위로 적용)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "1000"))
+# 워커가 시작 시점에 이미 사용 중인 주소 공간에 더해 허용하는 메모리
+PDF_WORKER_MEMORY_MB = int(os.getenv("PDF_WORKER_MEMORY_MB", "1024"))
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "120"))
+# 워커는 PyPDF2만 필요하므로 spawn으로 시작 (fork하면 모델/torch 매핑과 실행 중인 스레드의 잠금 상태까지 복제됨)
+PDF_EXTRACT_START_METHOD = os.getenv("PDF_EXTRACT_START_METHOD", "spawn")
+
+
+class PDFExtractionError(Exception):
+    """PDF 추출 실패 (손상된 파일, 페이지/메모리/시간 제한 초과)"""
+
+
+def _address_space_bytes() -> int:
+    """현재 프로세스의 가상 주소 공간 크기 (알 수 없으면 0)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _init_worker(memory_limit_mb: int):
+    """워커 프로세스 메모리 상한 설정 (초과 시 워커 안에서 MemoryError 발생)
+
+    상한은 워커가 이미 매핑한 주소 공간 + memory_limit_mb로 잡아,
+    시작 방식이나 부모 프로세스 크기와 관계없이 PDF 파싱에 쓸 수 있는 양만 제한한다.
+    """
+    try:
+        import resource
+        limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _count_pages(path: str) -> int:
+    from PyPDF2 import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[str]:
+    from PyPDF2 import PdfReader
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class PDFExtractor:
+    """페이지 범위를 프로세스 풀에 나눠 텍스트를 추출
+
+    파싱은 모두 워커 프로세스에서 실행되므로 손상되었거나 너무 큰 PDF가
+    API 프로세스를 멈추거나 종료시키지 않는다. 문서마다 별도의 풀을 사용하므로,
+    제한을 넘으면 그 문서의 워커만 종료하고 PDFExtractionError를 던진다 (동시에 처리 중인 다른 문서는 영향 없음).
+    """
+
+    def __init__(
+        self,
+        workers: int = PDF_EXTRACT_WORKERS,
+        pages_per_task: int = PDF_PAGES_PER_TASK,
+        max_pages: int = PDF_MAX_PAGES,
+        memory_limit_mb: int = PDF_WORKER_MEMORY_MB,
+        timeout: float = PDF_EXTRACT_TIMEOUT_SECONDS,
+        start_method: str = PDF_EXTRACT_START_METHOD,
+    ):
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.max_pages = max_pages
+        self.memory_limit_mb = memory_limit_mb
+        self.timeout = timeout
+        self.start_method = start_method
+        self._pools = set()  # 추출 중인 문서별 풀 (종료 시 정리)
+        self._lock = threading.Lock()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # 워커 프로세스는 작업이 들어올 때 필요한 만큼만 시작됨
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self.memory_limit_mb,),
+        )
+        with self._lock:
+            self._pools.add(pool)
+        return pool
+
+    def _close_pool(self, pool: ProcessPoolExecutor, kill: bool = False):
+        """문서 하나의 풀 정리 (kill=True면 멈추거나 깨진 워커 프로세스를 직접 종료)"""
+        with self._lock:
+            self._pools.discard(pool)
+        if kill:
+            # 실행 중인 작업은 취소할 수 없으므로 워커 프로세스를 직접 종료
+            for process in list((getattr(pool, "_processes", None) or {}).values()):
+                process.kill()
+        pool.shutdown(wait=not kill, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            pools = list(self._pools)
+        for pool in pools:
+            self._close_pool(pool, kill=True)
+
+    def extract(self, source: Union[str, bytes]) -> Tuple[str, int]:
+        """PDF 파일 경로 또는 바이트에서 텍스트 추출 -> (전처리된 텍스트, 페이지 수)"""
+        if isinstance(source, (bytes, bytearray)):
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                tmp.write(source)
+            try:
+                return self._extract_path(tmp.name)
+            finally:
+                os.remove(tmp.name)
+        return self._extract_path(source)
+
+    def _extract_path(self, path: str) -> Tuple[str, int]:
+        deadline = time.monotonic() + self.timeout
+        pool = self._new_pool()
+        kill = False
+        try:
+            page_count = pool.submit(_count_pages, path).result(timeout=self.timeout)
+            if page_count > self.max_pages:
+                raise PDFExtractionError(f"페이지 수 제한 초과: {page_count} > {self.max_pages}")
+
+            futures = [
+                pool.submit(_extract_page_range, path, start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+            parts = []
+            for future in futures:
+                parts.extend(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except PDFExtractionError:
+            raise
+        except FutureTimeoutError:
+            kill = True
+            raise PDFExtractionError(f"PDF 추출 시간 제한 초과 ({self.timeout:.0f}초)")
+        except BrokenProcessPool:
+            kill = True
+            raise PDFExtractionError("PDF 추출 워커가 비정상 종료되었습니다 (메모리 제한 초과 또는 손상된 파일)")
+        except MemoryError:
+            raise PDFExtractionError(f"PDF 추출 메모리 제한 초과 ({self.memory_limit_mb}MB)")
+        except Exception as e:
+            raise PDFExtractionError(f"PDF 파싱 실패: {str(e)}")
+        finally:
+            self._close_pool(pool, kill=kill)
+
+        # 페이지 텍스트는 마지막에 한 번만 결합
+        return preprocess_text("".join(parts)), page_count
+
+_extractor: Optional[PDFExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> PDFExtractor:
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = PDFExtractor()
+        return _extractor
+
+
+def extract_text(source: Union[str, bytes]) -> Tuple[str, int]:
+    """공유 PDFExtractor로 텍스트 추출 (블로킹 - 이벤트 루프에서는 스레드로 실행)"""
+    return get_extractor().extract(source)
@@ -1,55 +1,49 @@
-import json
-import torch
-from db.db1 import SessionDB1
-from models.vector_doc import VectorDocument
-from sentence_transformers import SentenceTransformer
-import google.generativeai as genai
-import os
-
-# 모델 로드
-model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-
-# Gemini API 설정
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-gemini_model = genai.GenerativeModel('gemini-2.0-pro')
-
-async def find_similar_contexts(question: str, top_k: int = 3):
-    """DB1에서 질문과 가장 유사한 context top_k개 찾기"""
-    q_vec = model.encode(question)
-    results = []
-
-    async with SessionDB1() as session:
-        docs = await session.execute(
-            VectorDocument.__table__.select()
-        )
-        docs = docs.scalars().all()
-
-        for doc in docs:
-            try:
-                doc_vec = json.loads(doc.embedding)
-                similarity = torch.cosine_similarity(
-                    torch.tensor(q_vec).unsqueeze(0),
-                    torch.tensor(doc_vec).unsqueeze(0)
-                ).item()
-                results.append((similarity, doc.content))
-            except Exception as e:
-                print(f"[ERROR] 벡터 비교 실패: {str(e)}")
-                continue
-
-    results.sort(key=lambda x: x[0], reverse=True)
-    top_contexts = [r[1] for r in results[:top_k]]
-    return top_contexts
-
-async def answer_with_rag(question: str):
-    """RAG를 이용해 질문에 답변 생성"""
-    contexts = await find_similar_contexts(question)
-    if not contexts:
-        return "관련 문맥을 찾을 수 없습니다."
-
-    prompt = "\n\n".join(contexts) + f"\n\n질문: {question}\n답변:"
-    try:
-        response = gemini_model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        print(f"[ERROR] Gemini 응답 실패: {str(e)}")
-        return "답변 생성에 실패했습니다."
+import os
+from typing import List, Optional
+from sqlalchemy import select
+from db.db1 import SessionDB1
+from db.engine import set_hnsw_search
+from models.vector_doc import VectorDocument
+from services import embedding_service, cpu_executor
+from services.llm_client import get_llm_client
+
+# HNSW 검색 시 탐색 후보 수 (클수록 정확도↑, 속도↓)
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "40"))
+
+# 답변 생성 모델
+RAG_ANSWER_MODEL = 'gemini-2.0-pro'
+
+async def find_similar_contexts(
+    question: str,
+    top_k: int = 3,
+    user_id: Optional[str] = None,
+    document_id: Optional[str] = None,
+) -> List[str]:
+    """DB1에서 질문과 가장 유사한 context top_k개 찾기 (pgvector 인덱스로 DB에서 정렬)"""
+    q_vec = (await cpu_executor.run(embedding_service.encode, question, preprocess=False)).tolist()
+    distance = VectorDocument.embedding.cosine_distance(q_vec)
+
+    stmt = select(VectorDocument.content).order_by(distance).limit(top_k)
+    if user_id:
+        stmt = stmt.where(VectorDocument.user_id == user_id)
+    if document_id:
+        stmt = stmt.where(VectorDocument.document_id == document_id)
+
+    async with SessionDB1() as session:
+        # SET LOCAL은 현재 트랜잭션에만 적용됨 (필터가 있으면 top_k개를 채우도록 후보를 더 탐색)
+        await set_hnsw_search(session, HNSW_EF_SEARCH, filtered=bool(user_id or document_id))
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+async def answer_with_rag(question: str, user_id: Optional[str] = None, document_id: Optional[str] = None):
+    """RAG를 이용해 질문에 답변 생성"""
+    contexts = await find_similar_contexts(question, user_id=user_id, document_id=document_id)
+    if not contexts:
+        return "관련 문맥을 찾을 수 없습니다."
+
+    prompt = "\n\n".join(contexts) + f"\n\n질문: {question}\n답변:"
+    try:
+        return await get_llm_client().generate(prompt, model=RAG_ANSWER_MODEL)
+    except Exception as e:
+        print(f"[ERROR] Gemini 응답 실패: {str(e)}")
+        return "답변 생성에 실패했습니다."
@@ -0,0 +1,100 @@
+# services/scoring_service.py
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from services import embedding_service, chunking
+
+if TYPE_CHECKING:
+    import torch  # 실행 시에는 사용하는 함수 안에서 import (서버 시작 시간 단축)
+
+# 문제에서 임베딩할 필드와 결과에 표시할 키
+QUESTION_FIELDS = ("question", "correct_answer", "explanation")
+SIMILARITY_KEYS = ("question", "answer", "explanation")
+
+
+def embed_question_fields(questions: List[Dict]) -> torch.Tensor:
+    """문제별 (질문, 정답, 해설) 임베딩을 한 번의 배치로 계산 -> (문제 수 * 3, dim)"""
+    texts = [str(q[field]) for q in questions for field in QUESTION_FIELDS]
+    return embedding_service.encode_batch(texts, convert_to_tensor=True)
+
+
+def similarity_scores(
+    field_embeddings: torch.Tensor,
+    chunk_embeddings: torch.Tensor,
+    weights: Sequence[float],
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """(문제 수 * 3) x 청크 수 유사도 행렬을 한 번의 행렬곱으로 계산
+
+    Returns:
+        max_similarities: 필드별 청크 최대 유사도 (문제 수, 3)
+        weighted: 가중치를 적용한 최종 유사도 (문제 수,)
+    """
+    import torch
+    fields = torch.nn.functional.normalize(field_embeddings.float(), dim=-1)
+    chunks = torch.nn.functional.normalize(chunk_embeddings.float().to(fields.device), dim=-1)
+    if chunks.dim() == 1:
+        chunks = chunks.unsqueeze(0)
+
+    matrix = fields @ chunks.T  # (문제 수 * 3, 청크 수)
+    max_similarities = matrix.max(dim=1).values.view(-1, len(QUESTION_FIELDS))
+    weighted = max_similarities @ torch.tensor(weights, dtype=max_similarities.dtype, device=fields.device)
+    return max_similarities, weighted
+
+
+def filter_questions(
+    questions: List[Dict],
+    chunk_embeddings: torch.Tensor,
+    weights: Sequence[float] = (0.4, 0.4, 0.2),
+    threshold: float = 0.35,
+) -> List[Dict]:
+    """청크 임베딩과의 가중 유사도가 임계값 이상인 문제만 반환"""
+    valid = [q for q in questions if all(q.get(field) for field in QUESTION_FIELDS)]
+    if len(valid) < len(questions):
+        print(f"[DEBUG] 필수 필드가 없는 문제 {len(questions) - len(valid)}개 제외")
+    if not valid or len(chunk_embeddings) == 0:
+        return []
+
+    field_embeddings = embed_question_fields(valid)
+    max_similarities, weighted = similarity_scores(field_embeddings, chunk_embeddings, weights)
+    passed = (weighted >= threshold).tolist()
+
+    max_rows = max_similarities.tolist()
+    weighted_scores = weighted.tolist()
+    return [
+        {
+            **question,
+            "semantic_similarity": weighted_scores[i],
+            "max_similarities": dict(zip(SIMILARITY_KEYS, max_rows[i]))
+        }
+        for i, question in enumerate(valid)
+        if passed[i]
+    ]
+
+
+def filter_questions_by_context(
+    questions: List[Dict],
+    context: str,
+    chunk_embeddings: Optional[torch.Tensor] = None,
+    weights: Sequence[float] = (0.4, 0.4, 0.2),
+    threshold: float = 0.35,
+) -> List[Dict]:
+    """문서 청크 임베딩 기준 filter_questions (저장된 청크 임베딩이 없으면 문서를 청크 분할 후 임베딩)"""
+    if chunk_embeddings is None or len(chunk_embeddings) == 0:
+        chunks = chunking.chunk_texts(context)
+        print(f"[DEBUG] 청크 생성 결과: {len(chunks)}개 청크 생성됨")
+        chunk_embeddings = embedding_service.encode_batch(chunks, convert_to_tensor=True) if chunks else []
+    else:
+        print(f"[DEBUG] 저장된 청크 임베딩 재사용: {len(chunk_embeddings)}개")
+    return filter_questions(questions, chunk_embeddings, weights=weights, threshold=threshold)
+
+
+def filter_similar_questions(questions: List[Dict], existing_texts: List[str], threshold: float = 0.85) -> List[Dict]:
+    """기존 문제와의 코사인 유사도가 threshold를 넘는 문제를 제외 (한 번의 행렬곱으로 계산)"""
+    if not questions or not existing_texts:
+        return list(questions)
+    import torch
+    new_embs = embedding_service.encode_batch([q["question"] for q in questions], convert_to_tensor=True, preprocess=False)
+    existing_embs = embedding_service.encode_batch(existing_texts, convert_to_tensor=True, preprocess=False)
+    similarities = torch.nn.functional.normalize(new_embs.float(), dim=-1) @ \
+        torch.nn.functional.normalize(existing_embs.float(), dim=-1).T
+    keep = (similarities.max(dim=1).values <= threshold).tolist()
+    return [q for q, k in zip(questions, keep) if k]
@@ -1,18 +1,18 @@
-# services/vector_service.py
-import json
-from sentence_transformers import SentenceTransformer
-from db.db1 import SessionDB1
-from models.vector_doc import VectorDocument
-
-model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-
-async def save_text_vector(text: str):
-    embedding = model.encode(text).tolist()
-
-    async with SessionDB1() as session:
-        doc = VectorDocument(
-            content=text,
-            embedding=json.dumps(embedding)
-        )
-        session.add(doc)
-        await session.commit()
+# services/vector_service.py
+from typing import Optional
+from db.db1 import SessionDB1
+from models.vector_doc import VectorDocument
+from services import embedding_service, cpu_executor
+
+async def save_text_vector(text: str, user_id: Optional[str] = None, document_id: Optional[str] = None):
+    embedding = (await cpu_executor.run(embedding_service.encode, text, preprocess=False)).tolist()
+
+    async with SessionDB1() as session:
+        doc = VectorDocument(
+            user_id=user_id,
+            document_id=document_id,
+            content=text,
+            embedding=embedding
+        )
+        session.add(doc)
+        await session.commit()
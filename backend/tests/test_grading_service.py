@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from services import embedding_service, grading_service
+
+
+def _answer(user_answer: str, correct_answer: str) -> dict:
+    return {
+        "question": "질문",
+        "user_answer": user_answer,
+        "correct_answer": correct_answer,
+        "type": "short_answer",
+    }
+
+
+@pytest.fixture
+def identical_embeddings(monkeypatch):
+    """모든 텍스트에 같은 벡터를 돌려줌 (임베딩 유사도 1.0에서도 정답 처리되지 않는지 확인)"""
+    monkeypatch.setattr(
+        embedding_service,
+        "encode_batch",
+        lambda texts, **kwargs: np.ones((len(texts), 4), dtype=np.float32),
+    )
+
+
+@pytest.mark.parametrize("user_answer, correct_answer", [
+    ("대칭키 암호화", "비대칭키 암호화"),
+    ("동기식 통신", "비동기식 통신"),
+    ("선형 탐색", "비선형 탐색"),
+    ("비선형 탐색", "선형 탐색"),
+])
+def test_negation_prefix_is_not_accepted(identical_embeddings, user_answer, correct_answer):
+    result = grading_service.grade_semantically([_answer(user_answer, correct_answer)])[0]
+    assert result is None or not result["is_correct"]
+
+
+def test_same_length_typo_is_accepted():
+    result = grading_service.grade_semantically([_answer("데이타베이스", "데이터베이스")])[0]
+    assert result is not None and result["is_correct"]
+    assert result["grading"] == "semantic"
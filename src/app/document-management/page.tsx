@@ -18,6 +18,7 @@ import {
 import { useSession } from 'next-auth/react';
 import { useRouter } from 'next/navigation';
 import axios from 'axios';
+import { waitForUploadJob } from '@/lib/uploadJob';
 
 interface DocumentItem {
   document_id: string;
@@ -81,9 +82,10 @@ export default function DocumentListPage() {
 
     setUploading(true);
     try {
-      await axios.post('https://edubackend-production.up.railway.app/api/upload-pdf', formData, {
+      const response = await axios.post('https://edubackend-production.up.railway.app/api/upload-pdf', formData, {
         headers: { 'Content-Type': 'multipart/form-data' },
       });
+      await waitForUploadJob(response.data.job_id);
       toast({ title: '업로드 성공', status: 'success' });
       fetchDocuments();
     } catch {
@@ -5,6 +5,7 @@ import { useState } from 'react';
 import axios from 'axios';
 import { useSession } from 'next-auth/react';
 import { Upload } from 'lucide-react'
+import { waitForUploadJob } from '@/lib/uploadJob';
 
 interface PDFUploaderProps {
   onUploadComplete: (documentId: string) => void;
@@ -52,8 +53,8 @@ export default function PDFUploader({ onUploadComplete }: PDFUploaderProps) {
         headers: { 'Content-Type': 'multipart/form-data' },
       });
 
-      const documentId = response.data.document_id;
-      onUploadComplete(documentId);
+      const job = await waitForUploadJob(response.data.job_id);
+      onUploadComplete(job.document_id);
 
       toast({
         title: '업로드 성공',
@@ -0,0 +1,18 @@
+import axios from 'axios';
+
+const UPLOAD_JOB_URL = 'https://edubackend-production.up.railway.app/api/upload-jobs';
+
+// 업로드 작업이 끝날 때까지 상태를 주기적으로 조회 (최대 대기 시간을 넘으면 실패 처리)
+export async function waitForUploadJob(
+  jobId: string,
+  { intervalMs = 2000, timeoutMs = 10 * 60 * 1000 }: { intervalMs?: number; timeoutMs?: number } = {}
+) {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    const res = await axios.get(`${UPLOAD_JOB_URL}/${jobId}`);
+    if (res.data.status === 'done') return res.data;
+    if (res.data.status === 'failed') throw new Error(res.data.error || '업로드 처리 실패');
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  throw new Error('업로드 처리 시간이 초과되었습니다.');
+}